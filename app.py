@@ -1,347 +1,313 @@
 import streamlit as st
 import pandas as pd
 import time, os
-from datetime import datetime
+
+from coach.config import PLAN_PATH, CAT_PATH, LOG_BACKEND, MEDIA_OFFLINE, PROFILE, PROFILE_PATH
+from coach.protocol import protocol_summary, rpe_hint
+from coach.catalog import (ensure_bootstrap_files, exercise_key, read_plan, read_catalog, catalog_records,
+                           CatalogRecord, PlanIndex, PlanRow)
+from coach.log_store import open_log_store, log_rows
+from coach.history import HistoryIndex
+from coach.analytics import TrainingAggregates
+from coach.progression import suggest_next_load, suggest_next_interval, batch_progression, interval_phase
+from coach.transfer import EXPORT_FORMATS, EXPORT_MIME, export_formats, prepare_export, import_log
+from coach.media import MediaCache, VIDEO_EXTS, youtube_id
+from coach.profiling import RerunProfiler
 
 st.set_page_config(page_title="Tennis Performance Coach", page_icon="🎾", layout="centered")
 st.title("🎾 Tennis Performance Coach")
 st.caption("12-week • 3 sessions/week • 50 minutes/session — Tennis-specific strength, speed & core")
 
-# ---------- BOOTSTRAP: auto-generate data files on first run ----------
-PLAN_PATH = "tennis_plan.csv"
-CAT_PATH = "exercise_catalog.csv"
-ASSETS_DIR = "assets"
-
-def ensure_bootstrap_files():
-    if not os.path.exists(ASSETS_DIR):
-        os.makedirs(ASSETS_DIR, exist_ok=True)
-        open(os.path.join(ASSETS_DIR, ".keep"), "a").close()
-
-    # Exercise catalog with YouTube media (plays inline)
-    if not os.path.exists(CAT_PATH):
-        catalog_rows = [
-            # exercise, category, primary_muscle, media_url (YouTube), cues, rep_low, rep_high, increment_kg, work_sec, rest_sec
-            ("Goblet Squat","Lower Body","Quads/Glutes","https://www.youtube.com/watch?v=MeIiIdhvXT4",
-             "Elbows in, chest up, brace core; drive through mid-foot",8,12,2.5,0,0),
-            ("Bulgarian Split Squat (Smith)","Lower Body","Quads/Glutes","https://www.youtube.com/watch?v=hiLF_pF3EJM",
-             "Long stance, knee tracks toes, torso tall, full depth",8,12,2.5,0,0),
-            ("Dumbbell Romanian Deadlift","Lower Body","Hamstrings/Glutes","https://www.youtube.com/watch?v=FQKfr1YDhEk",
-             "Hinge hips, neutral spine, soft knees; feel hamstrings",8,12,2.5,0,0),
-            ("Jump Squat","Plyometric","Quads/Glutes/Calves","https://www.youtube.com/watch?v=A-cFYWvaHr0",
-             "Explode up; soft landing; absorb with hips; quality > height",0,0,0.0,30,30),
-            ("Side Plank Rotation","Core","Obliques","https://www.youtube.com/watch?v=DXQ9YKHtcsk",
-             "Hips high; rotate from trunk; control tempo",0,0,0.0,30,30),
-            ("Ladder/Quick Feet (Cone Drill)","Agility","Ankles/Calves/Hips","https://www.youtube.com/watch?v=Kb0bfAGiub8",
-             "Light/quick contacts; posture tall; eyes forward",0,0,0.0,30,30),
-            ("Lunge with Twist (DB)","Core/Lower","Quads/Core","https://www.youtube.com/watch?v=7yrkGWJHSP0",
-             "Step long; front knee over mid-foot; twist over lead leg",8,12,2.5,0,0),
-            ("Dumbbell Slam / Speed Swing","Power","Full Body","https://www.youtube.com/watch?v=uB-fq0HqGK0",
-             "Hinge then snap; arms relaxed; glutes drive the swing",0,0,0.0,20,40),
-            ("Lat Pulldown","Upper Pull","Lats/Biceps","https://www.youtube.com/watch?v=SALxEARiMkw",
-             "Lean ~10–20°; pull elbows to ribs; control 2–3s down",8,12,2.5,0,0),
-            ("Russian Twist","Core","Obliques/Abs","https://www.youtube.com/watch?v=wkD8rjkodUI",
-             "Ribs down; rotate trunk; heels light; no lumbar flexion",16,30,1.0,0,0),
-            ("Push Press (DB/Smith)","Upper Push","Shoulders/Triceps","https://www.youtube.com/watch?v=MqvN10OF5fo",
-             "Dip–drive vertically; brace; press to lockout with control",6,8,2.5,0,0),
-            ("Dumbbell Bench Press","Upper Push","Chest/Triceps","https://www.youtube.com/watch?v=VmB1G1K7v94",
-             "Scapula set; slight arch; soft lockout; full ROM",8,12,2.5,0,0),
-            ("Single-arm Dumbbell Row","Upper Pull","Lats","https://www.youtube.com/watch?v=xl1YiqQY2vA",
-             "Row to hip; avoid trunk rotation; squeeze at top",10,12,2.5,0,0),
-            ("Shoulder External Rotation","Shoulder Care","Rotator cuff","https://www.youtube.com/watch?v=20v3G-odF5c",
-             "Elbow by side; light load; slow control",12,20,1.0,0,0),
-            ("Farmer Carry","Carry","Core/Grip","https://www.youtube.com/watch?v=rt17lmnaLSM",
-             "Ribs down; walk tall; even steps; no sway",0,0,0.0,40,40),
-        ]
-        cat_df = pd.DataFrame(catalog_rows, columns=[
-            "exercise","category","primary_muscle","media_url","cues",
-            "rep_low","rep_high","increment_kg","work_sec","rest_sec"
-        ])
-        cat_df.to_csv(CAT_PATH, index=False)
-
-    # 12-week plan with Base/Build/Peak progression (3 days/tuần)
-    if not os.path.exists(PLAN_PATH):
-        weeks = list(range(1,13))
-        rows = []
-        def phase(w): return "Base" if w<=4 else ("Build" if w<=8 else "Peak")
-        for w in weeks:
-            ph = phase(w)
-            # --- Day A (Power/Lower)
-            if ph=="Base":
-                if w in [1,2]:
-                    gs="4x10-12 @60-70% | Rest 75s"; bul="3x10/leg | Rest 75s"; rdl="4x8-10 | Rest 90s"
-                    js="3x30s work / 30s rest"; spr="3x30-40s/side"
-                else:
-                    gs="4x10-12 @65-75% | Rest 75s"; bul="4x8-10/leg | Rest 75s"; rdl="4x8-10 (slow 3s down) | Rest 90s"
-                    js="4x25s work / 35s rest"; spr="3x35-45s/side"
-            elif ph=="Build":
-                if w in [5,6,7]:
-                    gs="4x8-10 @70-80% | Rest 90s"; bul="4x8-10/leg | Rest 90s"; rdl="4x8 @75-80% | Rest 90s"
-                    js="4x20s work / 40s rest (max height)"; spr="3x40s/side"
-                else:
-                    gs="3x8-10 @65-75% | Rest 75s"; bul="3x8-10/leg | Rest 75s"; rdl="3x8 @70% | Rest 75s"
-                    js="3x20s work / 40s rest"; spr="3x30-40s/side"
-            else: # Peak
-                if w in [9,10,11]:
-                    gs="5x6-8 @75-85% (explosive concentric) | Rest 120s"; bul="4x6-8/leg (explosive up) | Rest 90s"
-                    rdl="4x6-8 (pause 1s at stretch) | Rest 120s"; js="4x15-20s work / 60s rest (max quality)"
-                    spr="3x45-60s/side"
-                else:
-                    gs="3x6-8 @70% | Rest 90s (taper)"; bul="3x8/leg | Rest 75s"; rdl="3x6-8 @70% | Rest 90s"
-                    js="3x15s work / 60s rest"; spr="3x40s/side"
-
-            rows += [
-                [f"Week {w}","Day A (Power/Lower)","Goblet Squat","load",gs],
-                [f"Week {w}","Day A (Power/Lower)","Bulgarian Split Squat (Smith)","load",bul],
-                [f"Week {w}","Day A (Power/Lower)","Dumbbell Romanian Deadlift","load",rdl],
-                [f"Week {w}","Day A (Power/Lower)","Jump Squat","time",js],
-                [f"Week {w}","Day A (Power/Lower)","Side Plank Rotation","time",spr],
-            ]
-
-            # --- Day B (Agility/Core)
-            if ph=="Base":
-                if w in [1,2]:
-                    lad="5x30s work / 30s rest (fast feet)"; ltw="3x10/side | Rest 60s"
-                    slam="4x20s work / 40s rest (med ball or DB swing)"; lpd="4x10-12 | Rest 75s"; rt="3x20 | Rest 45s"
-                else:
-                    lad="6x30s work / 25s rest (progress speed)"; ltw="4x10/side | Rest 60s"
-                    slam="5x20s work / 40s rest"; lpd="4x10-12 (2s down) | Rest 75s"; rt="3x24 | Rest 45s"
-            elif ph=="Build":
-                if w in [5,6,7]:
-                    lad="8x20s work / 20s rest (change patterns)"; ltw="4x12/side | Rest 60s"
-                    slam="6x15-20s work / 40s rest (max power)"; lpd="4x8-10 @70-80% | Rest 90s"; rt="4x20 weighted | Rest 60s"
-                else:
-                    lad="6x20s work / 25s rest (deload)"; ltw="3x10/side | Rest 60s"
-                    slam="4x15-20s work / 45s rest"; lpd="3x10 @65-70% | Rest 75s"; rt="3x16-20 | Rest 45s"
-            else:
-                if w in [9,10,11]:
-                    lad="10x15s work / 30s rest (max quality)"; ltw="3x8/side (controlled) | Rest 60s"
-                    slam="6x10-15s work / 60s rest (max intent)"; lpd="5x6-8 @75-85% | Rest 120s"; rt="3x16-20 (slow control) | Rest 45s"
-                else:
-                    lad="6x15s work / 30s rest (taper)"; ltw="2x8/side | Rest 60s"
-                    slam="4x10s work / 60s rest"; lpd="3x8 @70% | Rest 90s"; rt="2x16 | Rest 45s"
-
-            rows += [
-                [f"Week {w}","Day B (Agility/Core)","Ladder/Quick Feet (Cone Drill)","time",lad],
-                [f"Week {w}","Day B (Agility/Core)","Lunge with Twist (DB)","load",ltw],
-                [f"Week {w}","Day B (Agility/Core)","Dumbbell Slam / Speed Swing","time",slam],
-                [f"Week {w}","Day B (Agility/Core)","Lat Pulldown","load",lpd],
-                [f"Week {w}","Day B (Agility/Core)","Russian Twist","load",rt],
-            ]
-
-            # --- Day C (Upper/Stability)
-            if ph=="Base":
-                if w in [1,2]:
-                    pp="4x6-8 | Rest 90s"; dbb="3x10 | Rest 75s"; row="3x12/side | Rest 60s"; ser="3x15 light | Rest 45s"; fc="3x40m walk (core braced)"
-                else:
-                    pp="5x6-8 | Rest 90s"; dbb="4x8-10 | Rest 75s"; row="4x10-12/side | Rest 60s"; ser="3x15-20 light | Rest 45s"; fc="4x40m walk"
-            elif ph=="Build":
-                if w in [5,6,7]:
-                    pp="5x5-6 (explosive) | Rest 120s"; dbb="4x8-10 @70-80% | Rest 90s"; row="4x8-10/side @70-80% | Rest 90s"; ser="4x15 (slow) | Rest 45s"; fc="4x50m heavy walk"
-                else:
-                    pp="3x6 (deload) | Rest 90s"; dbb="3x8-10 @65-70% | Rest 75s"; row="3x10/side | Rest 75s"; ser="3x15 | Rest 45s"; fc="3x40m walk"
-            else:
-                if w in [9,10,11]:
-                    pp="6x3-5 (speed focus) | Rest 120s"; dbb="3x6-8 (controlled) | Rest 90s"; row="3x8-10/side (strict) | Rest 90s"; ser="3x15-20 (prehab) | Rest 45s"; fc="4x60m heavy walk"
-                else:
-                    pp="3x3-5 (taper) | Rest 120s"; dbb="2x8 light | Rest 60s"; row="2x8/side light | Rest 60s"; ser="2x15 | Rest 45s"; fc="2x40m easy walk"
+# Opt-in timings: COACH_PROFILE=1 appends every rerun to PROFILE_PATH; ?profile=1 shows the debug panel.
+prof = RerunProfiler(enabled=PROFILE or st.query_params.get("profile")=="1", path=PROFILE_PATH if PROFILE else None)
 
-            rows += [
-                [f"Week {w}","Day C (Upper/Stability)","Push Press (DB/Smith)","load",pp],
-                [f"Week {w}","Day C (Upper/Stability)","Dumbbell Bench Press","load",dbb],
-                [f"Week {w}","Day C (Upper/Stability)","Single-arm Dumbbell Row","load",row],
-                [f"Week {w}","Day C (Upper/Stability)","Shoulder External Rotation","load",ser],
-                [f"Week {w}","Day C (Upper/Stability)","Farmer Carry","time",fc],
-            ]
-
-        plan_df = pd.DataFrame(rows, columns=["Week","Day","Exercise","Type","Protocol"])
-        plan_df.to_csv(PLAN_PATH, index=False)
-
-ensure_bootstrap_files()
-# ---------- END BOOTSTRAP ----------
+with prof.section("bootstrap"): ensure_bootstrap_files()
 
 @st.cache_data
 def load_plan():
-    return pd.read_csv(PLAN_PATH)
+    return read_plan(PLAN_PATH)
 
 @st.cache_data
 def load_catalog():
-    c = pd.read_csv(CAT_PATH)
-    c["exercise_key"] = c["exercise"].str.strip().str.lower()
-    return c
+    return read_catalog(CAT_PATH)
+
+# Lookup structures hold plain objects, so they live in cache_resource (no pickling per rerun).
+@st.cache_resource
+def get_plan_index():
+    return PlanIndex(load_plan())
+
+@st.cache_resource
+def get_catalog_index():
+    return catalog_records(load_catalog())
+
+with prof.section("tables"):
+    plan_ix = get_plan_index()
+    catalog_ix = get_catalog_index()
+
+@st.cache_resource
+def get_log_store():
+    # one store per server process: survives reruns, and the files survive restarts
+    return open_log_store(LOG_BACKEND)
+
+with prof.section("log_store"): log_store = get_log_store()
+
+@st.cache_resource
+def get_history_index():
+    return HistoryIndex(get_log_store())
+
+with prof.section("history_index"): history_index = get_history_index()
+
+@st.cache_resource
+def get_training_aggregates():
+    return TrainingAggregates(get_log_store(), phases=get_plan_index().phase)
 
-plan_df = load_plan()
-catalog = load_catalog()
+with prof.section("analytics"): analytics = get_training_aggregates()
 
-if "log_df" not in st.session_state:
-    st.session_state["log_df"] = pd.DataFrame(columns=["datetime","week","day","exercise","type","set","weight_kg","reps","rir_rpe","work_sec","rest_sec","notes"])
+@st.cache_resource
+def get_media_cache():
+    return MediaCache()
 
-def phase_for_week(wn:int):
-    if wn<=4: return "Base (capacity)"
-    if wn<=8: return "Build (intensity)"
-    return "Peak (power/speed)"
+media_cache = get_media_cache()
+
+def offline_mode():
+    return st.session_state.get("offline", MEDIA_OFFLINE)
 
 def show_media(media):
     if not media or str(media).strip()=="": return
     m = str(media).strip()
+    hit = media_cache.get(m)
+    if hit and hit["kind"]=="video": st.video(hit["path"]); return
+    if hit and hit["kind"]=="image": st.image(hit["path"], use_column_width=True); return
+    if offline_mode():
+        if hit: st.image(hit["thumb"] or hit["path"], use_column_width=True)
+        st.caption("📴 Offline — video not available" if hit else "📴 Offline — media not cached"); return
     if "youtube.com" in m or "youtu.be" in m: st.video(m); return
     if os.path.exists(m):
-        if m.lower().endswith((".mp4",".mov",".m4v",".webm")): st.video(m)
-        else: st.image(m, use_container_width=True)
+        if m.lower().endswith(VIDEO_EXTS): st.video(m)
+        else: st.image(m, use_column_width=True)
     else:
         st.write(f"[Media link]({m})")
 
-def suggest_next_load(last_weight,last_reps,rep_low,rep_high,inc):
-    rep_low = rep_low if pd.notna(rep_low) and rep_low>0 else 8
-    rep_high = rep_high if pd.notna(rep_high) and rep_high>0 else 12
-    inc = inc if pd.notna(inc) and inc>0 else 2.5
-    last_weight = last_weight if pd.notna(last_weight) else 0.0
-    last_reps = last_reps if pd.notna(last_reps) else rep_low
-    if last_reps>=rep_high: return round(max(0.0,last_weight+inc),1), f"Reached {last_reps} ≥ {rep_high} → **+{inc} kg**"
-    if last_reps<rep_low:  return round(max(0.0,last_weight-inc),1), f"Below {rep_low} → **-{inc} kg**"
-    return round(last_weight,1), "In target range → keep weight, add 1–2 reps"
-
-def suggest_next_interval(last_work,last_rest,rpe_hint=6):
-    work = int(last_work or 30); rest = int(last_rest or 30)
-    if rpe_hint<=6: return work+5, max(0,rest-5), "Easy → **+5s work / -5s rest**"
-    if rpe_hint>=8: return max(5,work-5), rest+5, "Hard → **-5s work / +5s rest**"
-    return work, rest, "Maintain"
+def media_preview(media, key):
+    """Lightweight placeholder (YouTube thumbnail) until the user asks for the full embed."""
+    if not media or str(media).strip()=="": return
+    m = str(media).strip()
+    if st.toggle("🎬 Show demo", key=f"media_{key}"): show_media(m); return
+    hit = media_cache.get(m, touch=False); vid = youtube_id(m)
+    if hit and hit["thumb"]: st.image(hit["thumb"], width=160)
+    elif vid and not offline_mode(): st.image(f"https://img.youtube.com/vi/{vid}/mqdefault.jpg", width=160)
 
 def add_log_rows(week,day,ex_name,ex_type,rows):
-    now = datetime.now().isoformat(timespec="seconds")
-    new = []
-    for r in rows:
-        new.append({"datetime":now,"week":week,"day":day,"exercise":ex_name,"type":ex_type,
-                    "set":r.get("set",1),"weight_kg":r.get("weight_kg",0.0),"reps":r.get("reps",0),
-                    "rir_rpe":r.get("rir_rpe",""),"work_sec":r.get("work_sec",0),"rest_sec":r.get("rest_sec",0),
-                    "notes":r.get("notes","")})
-    st.session_state["log_df"] = pd.concat([st.session_state["log_df"], pd.DataFrame(new)], ignore_index=True)
-
-def history_for_exercise(name):
-    df = st.session_state["log_df"]
-    if df.empty: return df
-    return df[df["exercise"].str.lower()==name.strip().lower()].sort_values(["datetime","set"])
+    with prof.section("save"):
+        new = log_rows(week, day, ex_name, ex_type, rows)
+        log_store.append(new); history_index.add(new); analytics.add(new)
+
+# ---------- TIMERS: fragment-scoped, tick without rerunning the whole app ----------
+fragment = getattr(st, "fragment", None) or st.experimental_fragment   # st.fragment from Streamlit 1.37
+TIMER_TICK_SEC = 1
+
+@fragment(run_every=TIMER_TICK_SEC)
+def _countdown(key):
+    t = st.session_state[f"{key}_timer"]
+    rem = max(0, t["dur"] - int(time.time()-t["start"]))
+    st.progress(1 - rem/max(1, t["dur"])); st.write(f"⏳ {rem}s left")
+    if rem==0: t["done"] = True; st.rerun()   # one full rerun so the finished timer stops ticking
+
+@fragment(run_every=TIMER_TICK_SEC)
+def _interval_ticker(key):
+    t = st.session_state[f"{key}_timer"]
+    rnd, phase, left, done = interval_phase(int(time.time()-t["start"]), t["work"], t["rest"], t["rounds"])
+    if done > t["logged"]:
+        add_log_rows(t["week"], t["day"], t["exercise"], "time",
+                     [{"set":i+1,"weight_kg":0.0,"reps":0,"rir_rpe":"","work_sec":t["work"],"rest_sec":t["rest"],"notes":""} for i in range(t["logged"], done)])
+        t["logged"] = done
+    if phase=="DONE": t["done"] = True; st.rerun()
+    dur = t["work"] if phase=="WORK" else t["rest"]
+    st.write(f"**Round {rnd}/{t['rounds']} — {phase}**"); st.progress(1 - left/max(1, dur)); st.write(f"⏳ {left}s left")
+    if st.button("⏹ Stop", key=f"{key}_stop"): t["done"] = True; st.rerun()
 
 def rest_timer(seconds=60, key="rest"):
-    if st.button(f"▶️ Start {seconds}s", key=f"{key}_start"):
-        st.session_state[f"{key}_start"] = time.time(); st.session_state[f"{key}_dur"]=seconds
-    if f"{key}_start" in st.session_state:
-        el = int(time.time()-st.session_state[f"{key}_start"]); rem = max(0, st.session_state[f"{key}_dur"]-el)
-        st.progress(1 - rem/max(1, st.session_state[f"{key}_dur"])); st.write(f"⏳ {rem}s left")
-        if rem==0: st.success("Done!")
+    if st.button(f"▶️ Start {seconds}s", key=f"{key}_btn"):
+        st.session_state[f"{key}_timer"] = {"start":time.time(), "dur":seconds, "done":False}
+    t = st.session_state.get(f"{key}_timer")
+    if t is None: return
+    if t["done"]: st.progress(1.0); st.success("Done!")
+    else: _countdown(key)
 
-tab_plan, tab_session, tab_progression, tab_media, tab_export = st.tabs(["📅 Plan","📝 Session","📈 Progression","🎬 Media","📦 Export/Import"])
+def interval_timer(week, day, exercise, work, rest, rounds, key="intervals"):
+    """Cycles work/rest rounds in sequence; every completed round is logged through add_log_rows."""
+    if st.button("▶️ Start Intervals", key=f"{key}_btn"):
+        st.session_state[f"{key}_timer"] = {"start":time.time(), "week":week, "day":day, "exercise":exercise,
+                                            "work":int(work), "rest":int(rest), "rounds":int(rounds), "logged":0, "done":False}
+    t = st.session_state.get(f"{key}_timer")
+    if t is None: return
+    if t["done"]: st.success(f"Intervals finished! Logged {t['logged']}/{t['rounds']} rounds ({t['exercise']}).")
+    else: _interval_ticker(key)
 
-with tab_plan:
+def render_plan():
     st.subheader("Weekly Schedule")
-    wlist = sorted(plan_df["Week"].unique(), key=lambda x:int(str(x).split()[-1]))
-    week = st.selectbox("Choose Week", wlist, index=0); phase = phase_for_week(int(str(week).split()[-1]))
-    st.caption(f"Phase: **{phase}**")
-    day_names = plan_df[plan_df["Week"]==week]["Day"].unique().tolist()
-    day = st.selectbox("Choose Day", day_names, index=0)
-    today = plan_df[(plan_df["Week"]==week)&(plan_df["Day"]==day)]
-    for _, r in today.iterrows():
-        ex, etype, proto = r["Exercise"], r["Type"], r["Protocol"]
+    week = st.selectbox("Choose Week", plan_ix.weeks, index=0); wn = plan_ix.week_no[week]
+    stage = plan_ix.stage.get(wn, ""); st.caption(f"Phase: **{plan_ix.phase[wn]}**" + (f" · {stage}" if stage and stage!="main" else ""))
+    day = st.selectbox("Choose Day", plan_ix.days[week], index=0)
+    for r in plan_ix.rows(week, day):
+        ex, etype, proto = r.exercise, r.type, r.protocol
         st.markdown(f"### {ex}")
         st.markdown(f"<span style='padding:4px 8px; border:1px solid #999; border-radius:6px; font-size:12px;'>{etype.upper()}</span>", unsafe_allow_html=True)
         st.write(proto)
-        media=""; cues=""; rep_low=rep_high=inc=work_sec=rest_sec=None
-        m = catalog[catalog["exercise_key"]==ex.strip().lower()] if not catalog.empty else pd.DataFrame()
-        if not m.empty:
-            media = m["media_url"].iloc[0]; cues = m["cues"].iloc[0]; rep_low=m["rep_low"].iloc[0]; rep_high=m["rep_high"].iloc[0]
-            inc=m["increment_kg"].iloc[0]; work_sec=m["work_sec"].iloc[0]; rest_sec=m["rest_sec"].iloc[0]
-        show_media(media)
+        if r.sets: st.caption(protocol_summary(r))
+        rec = catalog_ix.get(r.exercise_key) or CatalogRecord.blank(ex)
+        media, cues = rec.media_url, rec.cues
+        # the catalog's own range wins; otherwise the plan's parsed prescription (e.g. "4x8-10"), then the 8–12 default
+        rep_low, rep_high = rec.rep_low or r.rep_low, rec.rep_high or r.rep_high
+        inc, work_sec, rest_sec = rec.increment_kg, rec.work_sec, rec.rest_sec
+        with prof.section("plan.media"): media_preview(media, key=f"{r.week_no}_{r.day}_{r.exercise_key}")
         if cues: st.caption(f"Cues: {cues}")
-        hist = history_for_exercise(ex)
+        last = history_index.last(ex)
         if etype=="load":
-            last = hist.tail(1); lw, lr = (last["weight_kg"].iloc[0], int(last["reps"].iloc[0])) if not last.empty else (0.0, rep_low or 8)
-            nxt, why = suggest_next_load(lw, lr, rep_low, rep_high, inc); st.info(f"Next load: **{nxt} kg** — {why}")
+            if last:
+                nxt, why = suggest_next_load(last["weight_kg"], int(last["reps"]), rep_low, rep_high, inc); st.info(f"Next load: **{nxt} kg** — {why}")
+            else:   # no history: with a fixed target ("3x10") the rules would already say +inc
+                lo, hi = int(rep_low or 8), int(rep_high or 12); st.info(f"Next load: pick a start weight for **{lo}–{hi} reps**" if lo!=hi else f"Next load: pick a start weight for **{lo} reps**")
         else:
-            last = hist.tail(1); lwk = int(last["work_sec"].iloc[0]) if not last.empty else int(work_sec or 30)
-            lrs = int(last["rest_sec"].iloc[0]) if not last.empty else int(rest_sec or 30)
-            w2, r2, why = suggest_next_interval(lwk, lrs, 6); st.info(f"Next interval: **{w2}s / {r2}s** — {why}")
+            lwk = int(last["work_sec"]) if last else int(r.work_sec or work_sec or 30)
+            lrs = int(last["rest_sec"]) if last else int(r.rest_sec or rest_sec or 30)
+            w2, r2, why = suggest_next_interval(lwk, lrs, rpe_hint(last["rir_rpe"]) if last else 6); st.info(f"Next interval: **{w2}s / {r2}s** — {why}")
         st.markdown("---")
-    if st.button("➡️ Use this day in Session"):
-        st.session_state["sel_week"]=str(week); st.session_state["sel_day"]=str(day)
+    st.button("➡️ Use this day in Session", on_click=_use_day, args=(week, day))
+
+def _use_day(week, day):
+    # runs as a callback, before the view radio is drawn, so it can switch the view too
+    st.session_state["sel_week"]=str(week); st.session_state["sel_day"]=str(day); st.session_state["view"]="📝 Session"
 
-with tab_session:
+def render_session():
     st.subheader("Session Tracking")
-    wlist2 = sorted(plan_df["Week"].unique(), key=lambda x:int(str(x).split()[-1]))
-    day_names2 = plan_df["Day"].unique().tolist()
-    sel_week = st.session_state.get("sel_week", wlist2[0]); sel_day = st.session_state.get("sel_day", day_names2[0])
+    sel_week = st.session_state.get("sel_week", plan_ix.weeks[0]); sel_day = st.session_state.get("sel_day", plan_ix.all_days[0])
     st.write(f"Selected: **{sel_week} — {sel_day}**")
-    today = plan_df[(plan_df["Week"]==sel_week)&(plan_df["Day"]==sel_day)]
-    ex_list = today["Exercise"].tolist() if not today.empty else plan_df["Exercise"].unique().tolist()
+    today = plan_ix.rows(sel_week, sel_day)
+    ex_list = [r.exercise for r in today] if today else plan_ix.exercises
     exercise = st.selectbox("Exercise", ex_list, index=0)
-    etype = today[today["Exercise"]==exercise]["Type"].iloc[0] if not today.empty else "load"
+    rx = next((r for r in today if r.exercise==exercise), None) or PlanRow()
+    etype = rx.type or "load"
     if etype=="load":
         st.markdown("**Enter sets (weight / reps / RIR-RPE / optional set time):**")
+        # defaults come from the parsed plan prescription
         default_sets = pd.DataFrame([
-            {"set":1,"weight_kg":0.0,"reps":8,"rir_rpe":"RIR2","work_sec":0,"rest_sec":60,"notes":""},
-            {"set":2,"weight_kg":0.0,"reps":8,"rir_rpe":"RIR2","work_sec":0,"rest_sec":60,"notes":""},
-            {"set":3,"weight_kg":0.0,"reps":8,"rir_rpe":"RIR2","work_sec":0,"rest_sec":60,"notes":""},
+            {"set":i+1,"weight_kg":0.0,"reps":rx.rep_low or 8,"rir_rpe":"RIR2","work_sec":0,"rest_sec":rx.rest_sec or 60,"notes":""}
+            for i in range(rx.sets or 3)
         ])
         edited = st.data_editor(default_sets, num_rows="dynamic", use_container_width=True)
-        rest_timer(60, key="rest_load")
+        rest_timer(rx.rest_sec or 60, key="rest_load")
         if st.button("➕ Save sets"):
             add_log_rows(sel_week, sel_day, exercise, "load", edited.to_dict(orient="records")); st.success(f"Saved {len(edited)} sets")
     else:
         st.markdown("**Intervals (work/rest rounds):**")
         c1,c2,c3 = st.columns(3)
-        with c1: work = st.number_input("Work (s)", min_value=5, value=30, step=5)
-        with c2: rest = st.number_input("Rest (s)", min_value=0, value=30, step=5)
-        with c3: rounds = st.number_input("Rounds", min_value=1, value=3, step=1)
-        if st.button("▶️ Start Intervals"):
-            for r in range(1, rounds+1):
-                st.write(f"**Round {r}/{rounds} — WORK**"); rest_timer(work, key=f"w{r}")
-                st.write(f"**Round {r}/{rounds} — REST**"); rest_timer(rest, key=f"r{r}")
-            st.success("Intervals finished!")
+        with c1: work = st.number_input("Work (s)", min_value=5, value=max(5, rx.work_sec or 30), step=5)
+        with c2: rest = st.number_input("Rest (s)", min_value=0, value=rx.rest_sec or 30, step=5)
+        with c3: rounds = st.number_input("Rounds", min_value=1, value=rx.sets or 3, step=1)
+        interval_timer(sel_week, sel_day, exercise, work, rest, rounds)
         rows = [{"set":i+1,"weight_kg":0.0,"reps":0,"rir_rpe":"","work_sec":work,"rest_sec":rest,"notes":""} for i in range(rounds)]
-        if st.button("➕ Save intervals"):
+        # the running timer logs its rounds itself; a manual save of the same exercise meanwhile would log them twice
+        t = st.session_state.get("intervals_timer")
+        timed = t is not None and not t["done"] and (t["week"], t["day"], t["exercise"])==(sel_week, sel_day, exercise)
+        if st.button("➕ Log intervals without timer", disabled=timed, help="The running timer logs these rounds" if timed else None):
             add_log_rows(sel_week, sel_day, exercise, "time", rows); st.success(f"Saved {rounds} rounds")
 
-    if not st.session_state["log_df"].empty:
-        st.markdown("### Recent log"); st.dataframe(st.session_state["log_df"].tail(30), use_container_width=True)
+    with prof.section("session.recent"): recent = log_store.tail(30)
+    if not recent.empty:
+        st.markdown("### Recent log"); st.dataframe(recent, use_container_width=True)
 
-with tab_progression:
+TREND_WINDOWS = {"12 weeks":12, "6 months":26, "1 year":52, "All":None}
+
+def render_progression():
     st.subheader("Auto Progression")
-    options = sorted(set(st.session_state["log_df"]["exercise"].tolist() + (catalog["exercise"].tolist() if not catalog.empty else [])))
+    weeks = TREND_WINDOWS[st.radio("Trend window", list(TREND_WINDOWS), horizontal=True, key="trend_window")]
+    options = sorted(set(history_index.exercises() + [r.exercise for r in catalog_ix.values()]))
     if options:
         ex_sel = st.selectbox("Exercise", options)
-        hist = history_for_exercise(ex_sel)
-        if hist.empty: st.info("No history yet.")
+        last = history_index.last(ex_sel)
+        if last is None: st.info("No history yet.")
         else:
-            last = hist.tail(1); etype = last["type"].iloc[0]
+            etype = last["type"]
             if etype=="load":
-                m = catalog[catalog["exercise_key"]==ex_sel.strip().lower()] if not catalog.empty else pd.DataFrame()
-                rep_low = m["rep_low"].iloc[0] if not m.empty else 8; rep_high = m["rep_high"].iloc[0] if not m.empty else 12; inc = m["increment_kg"].iloc[0] if not m.empty else 2.5
-                nxt, why = suggest_next_load(last["weight_kg"].iloc[0], int(last["reps"].iloc[0]), rep_low, rep_high, inc)
+                rec = catalog_ix.get(exercise_key(ex_sel))
+                rep_low, rep_high, inc = (rec.rep_low, rec.rep_high, rec.increment_kg) if rec else (8, 12, 2.5)
+                nxt, why = suggest_next_load(last["weight_kg"], int(last["reps"]), rep_low, rep_high, inc)
                 st.metric(f"Next load for {ex_sel}", f"{nxt} kg"); st.caption(why)
             else:
-                wsec = int(last["work_sec"].iloc[0] or 30); rsec = int(last["rest_sec"].iloc[0] or 30)
-                w2, r2, why = suggest_next_interval(wsec, rsec, 6); st.metric(f"Next interval for {ex_sel}", f"{w2}s / {r2}s"); st.caption(why)
+                wsec = int(last["work_sec"] or 30); rsec = int(last["rest_sec"] or 30)
+                w2, r2, why = suggest_next_interval(wsec, rsec, rpe_hint(last["rir_rpe"])); st.metric(f"Next interval for {ex_sel}", f"{w2}s / {r2}s"); st.caption(why)
+            with prof.section("progression.trend"): trend = analytics.exercise_trend(ex_sel, weeks).set_index("week_start")
+            if etype=="load":
+                st.markdown("**Estimated 1RM (Epley) by week**"); st.line_chart(trend[["e1rm"]])
+                st.markdown("**Tonnage (kg × reps) by week**"); st.bar_chart(trend[["tonnage"]])
+            else:
+                st.markdown("**Interval work (s) by week**"); st.bar_chart(trend[["work_sec"]])
     else:
         st.info("No exercises available.")
+    with prof.section("progression.batch"): table = batch_progression(history_index.last_frame(), load_catalog())
+    if not table.empty:
+        st.markdown("### Next session — all exercises")
+        st.dataframe(table.drop(columns=["athlete"]), use_container_width=True, hide_index=True)
+    with prof.section("progression.volume"): totals, phases = analytics.weekly_totals(weeks), analytics.phase_volume(weeks)
+    if not totals.empty:
+        st.markdown("### Weekly volume")
+        st.bar_chart(totals.set_index("week_start")[["tonnage"]]); st.bar_chart(totals.set_index("week_start")[["work_sec"]])
+        st.dataframe(phases.rename(columns={"tonnage":"tonnage_kg"}), use_container_width=True, hide_index=True)
 
-with tab_media:
+def render_media():
     st.subheader("Media Library")
-    st.caption("YouTube links are embedded by default. You can switch to local GIF/MP4 by editing `exercise_catalog.csv` and placing files in `assets/`.")
-    if catalog.empty: st.info("Upload `exercise_catalog.csv` to enable media.")
+    st.caption("YouTube links are embedded by default. You can switch to local GIF/MP4 by editing `exercise_catalog.csv` and placing files in `assets/`, or cache everything for offline use below.")
+    if not catalog_ix: st.info("Upload `exercise_catalog.csv` to enable media.")
     else:
-        name = st.selectbox("Exercise", catalog["exercise"].tolist())
-        row = catalog[catalog["exercise"]==name].iloc[0]
-        st.write(f"**{row['exercise']}** — {row['primary_muscle']}")
-        show_media(row['media_url'])
-        if row.get("cues"): st.caption(f"Cues: {row['cues']}")
+        row = st.selectbox("Exercise", list(catalog_ix.values()), format_func=lambda r: r.exercise)
+        st.write(f"**{row.exercise}** — {row.primary_muscle}")
+        with prof.section("media.show"): show_media(row.media_url)
+        if row.cues: st.caption(f"Cues: {row.cues}")
+        st.markdown("#### Offline cache")
+        st.caption(f"{len(media_cache.index)} item(s) cached • {media_cache.total_bytes()/2**20:.1f} / {media_cache.max_bytes/2**20:.0f} MB")
+        if st.button("⬇️ Cache all catalog media", disabled=offline_mode()):
+            with st.spinner("Downloading media…"):
+                ok, failed = media_cache.ingest_all(r.media_url for r in catalog_ix.values())
+            st.success(f"Cached {ok} item(s).")
+            for src, err in failed.items(): st.warning(f"{src}: {err}")
 
-with tab_export:
+def render_export():
     st.subheader("Export / Import")
-    st.download_button("⬇️ Download log CSV", st.session_state["log_df"].to_csv(index=False), file_name="workout_log.csv")
-    up = st.file_uploader("Restore log CSV", type=["csv"])
-    if up is not None:
+    fmt = st.selectbox("Format", export_formats())
+    if st.button("📦 Prepare download"):
+        # the payload is only built on request, streamed chunk by chunk into a file
+        with st.spinner("Exporting…"), prof.section("export"): path, n = prepare_export(log_store, fmt)
+        st.session_state["export"] = {"fmt":fmt, "path":path, "rows":n}
+    exp = st.session_state.get("export")
+    if exp and exp["fmt"]==fmt and os.path.exists(exp["path"]):
+        with open(exp["path"], "rb") as f:
+            st.download_button(f"⬇️ Download log ({exp['rows']} sets)", f, file_name="workout_log"+EXPORT_FORMATS[fmt], mime=EXPORT_MIME[fmt])
+    up = st.file_uploader("Import log (merged; duplicates skipped)", type=["csv","gz","parquet"])
+    if up is not None and st.session_state.get("imported_file") != getattr(up, "file_id", up.name):
+        # the uploader keeps returning the same file on every rerun; import it only once
         try:
-            st.session_state["log_df"] = pd.read_csv(up); st.success("Imported log.")
+            with st.spinner("Importing…"), prof.section("import"): added, dupes, bad = import_log(log_store, up, up.name, on_insert=[history_index.add, analytics.add])
+            st.session_state["imported_file"] = getattr(up, "file_id", up.name)
+            st.success(f"Imported {added} new sets ({dupes} duplicates skipped, {bad} invalid rows rejected).")
         except Exception as e:
             st.error(f"Import failed: {e}")
 
+# ---------- VIEWS: only the selected one is computed on a rerun ----------
+VIEWS = {"📅 Plan":render_plan, "📝 Session":render_session, "📈 Progression":render_progression,
+         "🎬 Media":render_media, "📦 Export/Import":render_export}
+
+st.sidebar.toggle("📴 Offline mode", value=MEDIA_OFFLINE, key="offline", help="Serve media only from the local cache under assets/")
+view = st.radio("View", list(VIEWS), horizontal=True, label_visibility="collapsed", key="view")
+with prof.section(f"view:{view}"): VIEWS[view]()
+
+run = prof.finish(view=view)
+if run:
+    runs = st.session_state.setdefault("profile_runs", []); runs.append(run); del runs[:-20]
+    with st.sidebar.expander(f"⏱ Rerun profile — {run['total_ms']:.0f} ms", expanded=False):
+        st.dataframe(pd.DataFrame([{"section":k, **v} for k,v in run["sections"].items()]).sort_values("ms", ascending=False),
+                     hide_index=True, use_container_width=True)
+        st.line_chart(pd.DataFrame({"total_ms":[r["total_ms"] for r in runs]}))
+
 st.markdown("---")
 st.caption("Add to Home Screen on iPhone/iPad for an app-like experience. Edit `exercise_catalog.csv` to swap media (YouTube or local GIF/MP4).")
@@ -0,0 +1,124 @@
+"""Benchmarks for the hot paths: each case times the old whole-frame pandas version against the current one
+on synthetic logs of several sizes. Export/import stream in bounded-memory chunks and dedup against the
+store, so they are expected to trail the all-in-memory legacy versions; watch them for regressions, not speedup.
+
+    python benchmarks/bench.py --sizes 1000,10000,100000 --json bench.json
+    python benchmarks/bench.py --baseline bench.json --tolerance 0.25   # exit 1 if a case got slower (by ≥ --min-delta-ms)
+"""
+import argparse, json, os, sys, tempfile, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from coach.catalog import exercise_key, catalog_records, CATALOG_TEXT_DEFAULTS, CATALOG_NUM_DEFAULTS
+from coach.log_store import open_log_store, log_rows
+from coach.history import HistoryIndex
+from coach.analytics import TrainingAggregates, weekly_aggregates
+from coach.progression import suggest_next_load, suggest_next_interval, batch_progression
+from coach.protocol import rpe_hint
+from coach.transfer import export_log, import_log
+from coach.media import MediaCache
+from coach.synthetic import synthetic_log
+
+def timeit(fn, repeat, budget=0.2, max_runs=200):
+    """Best run in ms: at least `repeat` runs, more (up to max_runs) while they fit in `budget` seconds,
+    so sub-millisecond cases aren't decided by a handful of noisy samples."""
+    best = float("inf"); start = time.perf_counter(); runs = 0
+    while runs < repeat or (runs < max_runs and time.perf_counter()-start < budget):
+        t = time.perf_counter(); fn(); best = min(best, time.perf_counter()-t); runs += 1
+    return best*1000
+
+def synthetic_catalog(log):
+    names = log["exercise"].drop_duplicates()
+    c = pd.DataFrame({"exercise":names, **CATALOG_TEXT_DEFAULTS, **CATALOG_NUM_DEFAULTS}).reset_index(drop=True)
+    c["exercise_key"] = exercise_key(c["exercise"]); c["rep_low"], c["rep_high"], c["increment_kg"] = 8, 12, 2.5
+    return c
+
+def legacy_progression(log, catalog):
+    out = []
+    for name, h in log.groupby("exercise"):
+        last = h.sort_values("datetime").iloc[-1]; c = catalog[catalog["exercise"]==name].iloc[0]
+        if last["type"]=="time": out.append(suggest_next_interval(last["work_sec"], last["rest_sec"], rpe_hint(last["rir_rpe"])))
+        else: out.append(suggest_next_load(last["weight_kg"], int(last["reps"]), c["rep_low"], c["rep_high"], c["increment_kg"]))
+    return out
+
+def reimport(store, path):
+    with open(path, "rb") as f: return import_log(store, f, path)
+
+def run_size(n, repeat, tmp):
+    log = synthetic_log(n); cat = synthetic_catalog(log); name = log["exercise"].iloc[-1]
+    csv_path = os.path.join(tmp, f"log-{n}.csv"); log.to_csv(csv_path, index=False)
+    store = open_log_store("sqlite", path=os.path.join(tmp, f"log-{n}.db")); store.replace(log)
+    index = HistoryIndex(store); new = log_rows("Week 12", "Day A", name, "load", [{"set":1,"weight_kg":40.0,"reps":8}])
+    aggs = TrainingAggregates(store); recs = catalog_records(cat); day = cat["exercise"].tolist()[:8]
+    # saves go to their own copy, so the repeated appends don't change what the other cases measure
+    save_store = open_log_store("sqlite", path=os.path.join(tmp, f"save-{n}.db")); save_store.replace(log)
+    save_index, save_aggs = HistoryIndex(save_store), TrainingAggregates(save_store)
+    cases = {
+        "save":        (lambda: pd.concat([log, new], ignore_index=True),
+                        lambda: (save_store.append(new), save_index.add(new), save_aggs.add(new))),
+        # a cache miss is an indexed store query; "history_cached" is the warm LRU read that follows it
+        "history":     (lambda: log[log["exercise"]==name].sort_values("datetime"),
+                        lambda: store.history(name)),
+        "history_cached": (lambda: log[log["exercise"]==name].sort_values("datetime"),
+                        lambda: (index.history(name), index.last(name))),
+        "plan_lookup": (lambda: [cat[cat["exercise"]==e].iloc[0] for e in day],
+                        lambda: [recs.get(exercise_key(e)) for e in day]),
+        "export":      (lambda: log.to_csv(index=False),
+                        lambda: export_log(store, "CSV", os.path.join(tmp, "export.csv"))),
+        "progression": (lambda: legacy_progression(log, cat),
+                        lambda: batch_progression(index.last_frame(), cat)),
+        "analytics":   (lambda: weekly_aggregates(log),
+                        lambda: (aggs.exercise_trend(name), aggs.weekly_totals(), aggs.phase_volume())),
+        "import":      (lambda: pd.concat([log, pd.read_csv(csv_path)]).drop_duplicates(["datetime","exercise","set"]),
+                        lambda: reimport(store, csv_path)),
+    }
+    rows = []
+    for case, (old, cur) in cases.items():
+        # legacy progression sorts every exercise's full history; past 100k rows it only adds minutes
+        legacy_ms = timeit(old, repeat) if not (case=="progression" and n > 100_000) else float("nan")
+        rows.append({"case":case, "size":n, "legacy_ms":round(legacy_ms, 3), "new_ms":round(timeit(cur, repeat), 3)})
+    return rows
+
+def run_media(repeat, tmp):
+    files = []
+    for i in range(50):
+        p = os.path.join(tmp, f"clip{i}.gif")
+        with open(p, "wb") as f: f.write(os.urandom(2048))
+        files.append(p)
+    cache = MediaCache(os.path.join(tmp, "media"), max_bytes=2**30); cache.ingest_all(files)
+    return [{"case":"media", "size":len(files), "legacy_ms":round(timeit(lambda: [os.path.exists(p) for p in files], repeat), 3),
+             "new_ms":round(timeit(lambda: [cache.get(p) for p in files], repeat), 3)}]
+
+def regressions(rows, baseline, tolerance, min_delta_ms=1.0):
+    """Cases slower than baseline by more than `tolerance` (relative) and `min_delta_ms` (absolute)."""
+    base = {(r["case"], r["size"]): r["new_ms"] for r in baseline}
+    return [(r, b) for r in rows for b in [base.get((r["case"], r["size"]))]
+            if b is not None and r["new_ms"] > b*(1+tolerance) and r["new_ms"]-b >= min_delta_ms]
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", default="1000,10000,100000,1000000", help="comma-separated log sizes (rows)")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--json", help="write results to this file")
+    ap.add_argument("--baseline", help="results file from an earlier run to compare against")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    ap.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore slowdowns smaller than this, in ms")
+    args = ap.parse_args(argv)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in (int(s) for s in args.sizes.split(",") if s.strip()):
+            print(f"… {n:,} rows", file=sys.stderr, flush=True); rows += run_size(n, args.repeat, tmp)
+        rows += run_media(args.repeat, tmp)
+    df = pd.DataFrame(rows); df["speedup"] = (df["legacy_ms"]/df["new_ms"]).round(1)
+    print(df.to_string(index=False))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f: json.dump(rows, f, indent=1)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f: slow = regressions(rows, json.load(f), args.tolerance, args.min_delta_ms)
+        for r, b in slow: print(f"REGRESSION {r['case']} @ {r['size']:,}: {r['new_ms']:.1f} ms (baseline {b:.1f} ms)", file=sys.stderr)
+        return 1 if slow else 0
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
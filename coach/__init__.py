@@ -0,0 +1,5 @@
+"""Streamlit-free core of the Tennis Performance Coach.
+
+Importing the package does no I/O and loads no submodules; import what you need, e.g.
+``from coach.progression import batch_progression``. ``python -m coach`` is the CLI.
+"""
@@ -0,0 +1,88 @@
+"""Training analytics (tonnage, e1RM, interval work, phase volume) kept as per-(exercise, calendar week) aggregates."""
+import threading
+import pandas as pd
+
+from .catalog import exercise_key
+from .log_store import coerce_log
+from .program import phase_for_week
+
+WEEKLY_COLUMNS = ["exercise","week_no","sets","tonnage","e1rm","work_sec"]
+_AGG = {"exercise":"last", "week_no":"last", "sets":"sum", "tonnage":"sum", "e1rm":"max", "work_sec":"sum"}
+_KEY = ["exercise_key","week_start"]
+
+def epley_1rm(weight, reps):
+    """Estimated 1RM, weight·(1 + reps/30); NaN where there is no loaded set to estimate from."""
+    return (weight*(1 + reps/30)).where((weight > 0) & (reps > 0))
+
+def weekly_aggregates(df):
+    """One row per (exercise_key, week_start) for a log frame, week_start being the Monday of the set's
+    calendar week, so repeated program cycles stay apart. week_no is the plan week ("Week N") logged in
+    that week (0 if the label has no number). Rows with an unreadable datetime are skipped."""
+    df = coerce_log(df)
+    when = pd.to_datetime(df["datetime"], errors="coerce", format="ISO8601")
+    df, when = df[when.notna()], when[when.notna()]
+    if df.empty: return pd.DataFrame(columns=WEEKLY_COLUMNS, index=pd.MultiIndex.from_tuples([], names=_KEY))
+    load = df["type"].ne("time")
+    part = pd.DataFrame({"exercise_key":exercise_key(df["exercise"]), "week_start":when.dt.normalize() - pd.to_timedelta(when.dt.weekday, unit="D"),
+                         "exercise":df["exercise"], "sets":1,
+                         "week_no":pd.to_numeric(df["week"].str.extract(r"(\d+)", expand=False), errors="coerce").fillna(0).astype(int),
+                         "tonnage":(df["weight_kg"]*df["reps"]).where(load, 0.0),
+                         "e1rm":epley_1rm(df["weight_kg"], df["reps"]).where(load),
+                         "work_sec":df["work_sec"].where(~load, 0)})
+    return part.groupby(_KEY, sort=False).agg(_AGG)
+
+class TrainingAggregates:
+    """Materialized weekly aggregates for a LogStore: built by one chunked scan, then extended by add()
+    with only the newly written rows. Reads touch exercises × weeks rows, never the log itself.
+    `phases` ({week_no: phase}, e.g. PlanIndex.phase) labels plan weeks; others fall back to phase_for_week.
+    Readers take `weeks` to limit themselves to the last N calendar weeks that have sets (None = all)."""
+    def __init__(self, store, phases=None):
+        self.store, self.phases = store, dict(phases or {}); self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        weekly = weekly_aggregates(pd.DataFrame())
+        for chunk in self.store.iter_chunks():
+            weekly = self._combine(weekly, weekly_aggregates(chunk))
+        with self._lock: self._weekly = weekly
+
+    @staticmethod
+    def _combine(a, b):
+        if b.empty: return a
+        if a.empty: return b
+        return pd.concat([a, b]).groupby(level=[0,1], sort=False).agg(_AGG)
+
+    def add(self, df):
+        part = weekly_aggregates(df)
+        if part.empty: return
+        with self._lock: self._weekly = self._combine(self._weekly, part)
+
+    def _phase(self, wn):
+        return self.phases.get(wn) or (phase_for_week(wn) if wn > 0 else "")
+
+    def weekly(self, weeks=None):
+        """All (exercise, calendar week) aggregates, with the plan phase of each week."""
+        with self._lock: w = self._weekly
+        w = w.reset_index().sort_values(["exercise_key","week_start"], kind="stable").reset_index(drop=True)
+        if weeks and not w.empty:
+            w = w[w["week_start"] > w["week_start"].max() - pd.Timedelta(weeks=weeks)].reset_index(drop=True)
+        w["phase"] = w["week_no"].map({n: self._phase(n) for n in w["week_no"].unique()})
+        return w
+
+    def exercise_trend(self, name, weeks=None):
+        """Week-by-week sets, tonnage, best e1RM and interval work for one exercise."""
+        w = self.weekly(weeks)
+        return w[w["exercise_key"]==exercise_key(name)].drop(columns="exercise_key").reset_index(drop=True)
+
+    def weekly_totals(self, weeks=None):
+        """Sets, tonnage and interval work per calendar week across all exercises."""
+        w = self.weekly(weeks)
+        t = w.groupby("week_start", as_index=False).agg(week_no=("week_no","max"), sets=("sets","sum"),
+                                                         tonnage=("tonnage","sum"), work_sec=("work_sec","sum"))
+        t["phase"] = t["week_no"].map({n: self._phase(n) for n in t["week_no"].unique()})
+        return t
+
+    def phase_volume(self, weeks=None):
+        """Sets, tonnage and interval work per phase, in program order."""
+        t = self.weekly_totals(weeks)
+        return t.groupby("phase", as_index=False, sort=False)[["sets","tonnage","work_sec"]].sum()
@@ -0,0 +1,134 @@
+"""Exercise catalog and plan tables, and the compact lookup structures built from them."""
+import os
+import pandas as pd
+
+from .config import PLAN_PATH, CAT_PATH, ASSETS_DIR
+from .program import TENNIS_PROGRAM, compile_program, phase_for_week
+from .protocol import PROTOCOL_COLUMNS, parse_protocol
+
+def exercise_key(names):
+    """Normalized exercise key shared by the catalog, the log store and the history index."""
+    return names.str.strip().str.lower() if isinstance(names, pd.Series) else str(names).strip().lower()
+
+CATALOG_TEXT_DEFAULTS = {"category":"","primary_muscle":"","media_url":"","cues":""}
+CATALOG_NUM_DEFAULTS = {"rep_low":0,"rep_high":0,"increment_kg":0.0,"work_sec":0,"rest_sec":0}   # 0 → progression defaults
+
+def week_number(label):
+    return int(str(label).split()[-1])
+
+def read_plan(path=PLAN_PATH):
+    p = pd.read_csv(path)
+    p["week_no"] = p["Week"].map(week_number)
+    if "Phase" not in p: p["Phase"] = p["week_no"].map(phase_for_week)   # plan CSVs written before Phase/Stage
+    if "Stage" not in p: p["Stage"] = ""
+    p["exercise_key"] = exercise_key(p["Exercise"])
+    parsed = pd.DataFrame([parse_protocol(x) for x in p["Protocol"]], columns=PROTOCOL_COLUMNS, index=p.index)
+    return pd.concat([p, parsed], axis=1)
+
+def read_catalog(path=CAT_PATH):
+    c = pd.read_csv(path)
+    # older/hand-edited catalogs (like the shipped one) may lack the interval or rep columns
+    for col, default in CATALOG_TEXT_DEFAULTS.items():
+        c[col] = c[col].fillna(default).astype(str) if col in c else default
+    for col, default in CATALOG_NUM_DEFAULTS.items():
+        c[col] = pd.to_numeric(c[col], errors="coerce").fillna(default) if col in c else default
+    c["exercise_key"] = exercise_key(c["exercise"])
+    return c
+
+class Record:
+    """Compact row object; subclasses name their fields in __slots__."""
+    __slots__ = ()
+    def __init__(self, **kw):
+        for f in self.__slots__: setattr(self, f, kw.get(f))
+    def get(self, f, default=None):
+        return getattr(self, f, default)
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{f}={getattr(self, f)!r}' for f in self.__slots__)})"
+
+class CatalogRecord(Record):
+    __slots__ = ("exercise","exercise_key",*CATALOG_TEXT_DEFAULTS,*CATALOG_NUM_DEFAULTS)
+
+    @classmethod
+    def blank(cls, name):
+        return cls(exercise=name, exercise_key=exercise_key(name), **CATALOG_TEXT_DEFAULTS, **CATALOG_NUM_DEFAULTS)
+
+class PlanRow(Record):
+    __slots__ = ("week","week_no","day","exercise","exercise_key","type","protocol",*PROTOCOL_COLUMNS)
+
+class PlanIndex:
+    """Plan table compiled once per load: (week_no, day) → rows, ordered week/day lists and week_no → phase/stage."""
+    __slots__ = ("weeks","week_no","days","all_days","exercises","by_day","phase","stage")
+    def __init__(self, plan):
+        self.week_no, self.days, self.by_day = {}, {}, {}
+        self.phase = dict(zip(plan["week_no"], plan["Phase"])); self.stage = dict(zip(plan["week_no"], plan["Stage"].fillna("")))
+        cols = {"Week":"week","week_no":"week_no","Day":"day","Exercise":"exercise","exercise_key":"exercise_key","Type":"type","Protocol":"protocol",
+                **{c: c for c in PROTOCOL_COLUMNS}}
+        for rec in plan[list(cols)].rename(columns=cols).to_dict("records"):
+            rec["week"] = week = str(rec["week"]); wn, day = rec["week_no"], rec["day"]
+            self.week_no[week] = wn
+            days = self.days.setdefault(week, [])
+            if day not in days: days.append(day)
+            self.by_day.setdefault((wn, day), []).append(PlanRow(**rec))
+        self.by_day = {k: tuple(v) for k, v in self.by_day.items()}
+        self.weeks = sorted(self.week_no, key=self.week_no.get)
+        self.all_days = list(dict.fromkeys(plan["Day"]))
+        self.exercises = list(dict.fromkeys(plan["Exercise"]))
+
+    def rows(self, week, day):
+        return self.by_day.get((self.week_no.get(str(week)), day), ())
+
+def catalog_records(c):
+    recs = {}
+    for row in c[list(CatalogRecord.__slots__)].to_dict("records"):
+        recs.setdefault(row["exercise_key"], CatalogRecord(**row))   # first row wins, as before
+    return recs
+
+# ---------- BOOTSTRAP: auto-generate data files on first run ----------
+def ensure_bootstrap_files():
+    if not os.path.exists(ASSETS_DIR):
+        os.makedirs(ASSETS_DIR, exist_ok=True)
+        open(os.path.join(ASSETS_DIR, ".keep"), "a").close()
+
+    # Exercise catalog with YouTube media (plays inline)
+    if not os.path.exists(CAT_PATH):
+        catalog_rows = [
+            # exercise, category, primary_muscle, media_url (YouTube), cues, rep_low, rep_high, increment_kg, work_sec, rest_sec
+            ("Goblet Squat","Lower Body","Quads/Glutes","https://www.youtube.com/watch?v=MeIiIdhvXT4",
+             "Elbows in, chest up, brace core; drive through mid-foot",8,12,2.5,0,0),
+            ("Bulgarian Split Squat (Smith)","Lower Body","Quads/Glutes","https://www.youtube.com/watch?v=hiLF_pF3EJM",
+             "Long stance, knee tracks toes, torso tall, full depth",8,12,2.5,0,0),
+            ("Dumbbell Romanian Deadlift","Lower Body","Hamstrings/Glutes","https://www.youtube.com/watch?v=FQKfr1YDhEk",
+             "Hinge hips, neutral spine, soft knees; feel hamstrings",8,12,2.5,0,0),
+            ("Jump Squat","Plyometric","Quads/Glutes/Calves","https://www.youtube.com/watch?v=A-cFYWvaHr0",
+             "Explode up; soft landing; absorb with hips; quality > height",0,0,0.0,30,30),
+            ("Side Plank Rotation","Core","Obliques","https://www.youtube.com/watch?v=DXQ9YKHtcsk",
+             "Hips high; rotate from trunk; control tempo",0,0,0.0,30,30),
+            ("Ladder/Quick Feet (Cone Drill)","Agility","Ankles/Calves/Hips","https://www.youtube.com/watch?v=Kb0bfAGiub8",
+             "Light/quick contacts; posture tall; eyes forward",0,0,0.0,30,30),
+            ("Lunge with Twist (DB)","Core/Lower","Quads/Core","https://www.youtube.com/watch?v=7yrkGWJHSP0",
+             "Step long; front knee over mid-foot; twist over lead leg",8,12,2.5,0,0),
+            ("Dumbbell Slam / Speed Swing","Power","Full Body","https://www.youtube.com/watch?v=uB-fq0HqGK0",
+             "Hinge then snap; arms relaxed; glutes drive the swing",0,0,0.0,20,40),
+            ("Lat Pulldown","Upper Pull","Lats/Biceps","https://www.youtube.com/watch?v=SALxEARiMkw",
+             "Lean ~10–20°; pull elbows to ribs; control 2–3s down",8,12,2.5,0,0),
+            ("Russian Twist","Core","Obliques/Abs","https://www.youtube.com/watch?v=wkD8rjkodUI",
+             "Ribs down; rotate trunk; heels light; no lumbar flexion",16,30,1.0,0,0),
+            ("Push Press (DB/Smith)","Upper Push","Shoulders/Triceps","https://www.youtube.com/watch?v=MqvN10OF5fo",
+             "Dip–drive vertically; brace; press to lockout with control",6,8,2.5,0,0),
+            ("Dumbbell Bench Press","Upper Push","Chest/Triceps","https://www.youtube.com/watch?v=VmB1G1K7v94",
+             "Scapula set; slight arch; soft lockout; full ROM",8,12,2.5,0,0),
+            ("Single-arm Dumbbell Row","Upper Pull","Lats","https://www.youtube.com/watch?v=xl1YiqQY2vA",
+             "Row to hip; avoid trunk rotation; squeeze at top",10,12,2.5,0,0),
+            ("Shoulder External Rotation","Shoulder Care","Rotator cuff","https://www.youtube.com/watch?v=20v3G-odF5c",
+             "Elbow by side; light load; slow control",12,20,1.0,0,0),
+            ("Farmer Carry","Carry","Core/Grip","https://www.youtube.com/watch?v=rt17lmnaLSM",
+             "Ribs down; walk tall; even steps; no sway",0,0,0.0,40,40),
+        ]
+        cat_df = pd.DataFrame(catalog_rows, columns=[
+            "exercise","category","primary_muscle","media_url","cues",
+            "rep_low","rep_high","increment_kg","work_sec","rest_sec"
+        ])
+        cat_df.to_csv(CAT_PATH, index=False)
+
+    if not os.path.exists(PLAN_PATH):
+        compile_program(TENNIS_PROGRAM).to_csv(PLAN_PATH, index=False)
@@ -0,0 +1,87 @@
+"""Headless entry point: plans and progression as JSON, for one athlete or a whole roster.
+
+    python -m coach plan [--spec SPEC.json] [--phase-weeks Base=3,Build=5] [--days "Day A ...;Day C ..."]
+    python -m coach progression LOG.csv [--catalog exercise_catalog.csv]
+    python -m coach roster ROSTER.json [--workers 8] [--processes]
+
+A roster is a JSON list of athletes: {"athlete", "log"?, "spec"?, "phase_weeks"?, "days"?, "swaps"?}.
+Missing specs default to the built-in 12-week tennis program. A log with an "athlete" column may be shared
+by several entries; each entry only uses its own rows.
+"""
+import argparse, json, os, sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+
+from .config import CAT_PATH
+
+def _frame_json(df):
+    return json.loads(df.to_json(orient="records"))   # NaN → null
+
+@lru_cache(maxsize=8)
+def _catalog(path):
+    from .catalog import read_catalog
+    return read_catalog(path) if path and os.path.exists(path) else None
+
+def read_log_file(path):
+    """A whole log file (CSV, .csv.gz or Parquet) through the import validator; rejected rows are dropped."""
+    import pandas as pd
+    from .log_store import empty_log
+    from .transfer import read_log_chunks, validate_log_chunk
+    with open(path, "rb") as f:
+        parts = [validate_log_chunk(raw)[0].assign(**({"athlete": raw["athlete"]} if "athlete" in raw else {})) for raw in read_log_chunks(f, path)]
+    return pd.concat(parts, ignore_index=True) if parts else empty_log()
+
+def _spec_for(job):
+    from .program import TENNIS_PROGRAM, derive_program
+    return derive_program(job.get("spec") or TENNIS_PROGRAM, phase_weeks=job.get("phase_weeks"),
+                          days=job.get("days"), swaps=job.get("swaps"))
+
+def run_athlete(job, catalog_path=CAT_PATH, with_plan=True):
+    """One roster entry → {"athlete", "spec_hash", "weeks", "plan"?, "progression"}."""
+    from .program import compile_program, spec_hash
+    from .progression import batch_progression
+    spec = _spec_for(job); plan = compile_program(spec)
+    out = {"athlete": job.get("athlete", ""), "spec_hash": spec_hash(spec), "weeks": int(plan["Week"].nunique())}
+    if with_plan: out["plan"] = _frame_json(plan)
+    log = read_log_file(job["log"]) if job.get("log") else None
+    if log is not None and "athlete" in log:
+        log = log[log["athlete"].astype(str)==str(out["athlete"])]   # shared team logs: only this entry's rows
+    out["progression"] = [] if log is None else _frame_json(batch_progression(log, _catalog(catalog_path)).drop(columns=["athlete"]))
+    return out
+
+def _parse_weeks(text):
+    return {k.strip(): int(v) for k, v in (p.split("=") for p in text.split(","))} if text else None
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m coach", description=__doc__.split("\n")[0])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("plan", help="compile a program spec into a plan table")
+    p.add_argument("--spec"); p.add_argument("--phase-weeks"); p.add_argument("--days")
+    p.add_argument("--format", choices=["json","csv"], default="json")
+    p = sub.add_parser("progression", help="next load/interval for every athlete and exercise in a log")
+    p.add_argument("log"); p.add_argument("--catalog", default=CAT_PATH)
+    p = sub.add_parser("roster", help="plans and progression for many athletes in one process")
+    p.add_argument("roster"); p.add_argument("--catalog", default=CAT_PATH)
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    p.add_argument("--processes", action="store_true", help="use a process pool instead of threads")
+    p.add_argument("--no-plan", action="store_true", help="omit the plan rows from the output")
+    a = ap.parse_args(argv)
+
+    if a.cmd=="plan":
+        from .program import compile_program
+        job = {"spec": json.load(open(a.spec, encoding="utf-8")) if a.spec else None,
+               "phase_weeks": _parse_weeks(a.phase_weeks), "days": a.days.split(";") if a.days else None}
+        plan = compile_program(_spec_for(job))
+        if a.format=="csv": plan.to_csv(sys.stdout, index=False)
+        else: json.dump(_frame_json(plan), sys.stdout)
+    elif a.cmd=="progression":
+        from .progression import batch_progression
+        json.dump(_frame_json(batch_progression(read_log_file(a.log), _catalog(a.catalog))), sys.stdout)
+    else:
+        with open(a.roster, encoding="utf-8") as f: jobs = json.load(f)
+        pool = ProcessPoolExecutor if a.processes else ThreadPoolExecutor
+        with pool(max_workers=max(1, a.workers)) as ex:
+            results = list(ex.map(run_athlete, jobs, [a.catalog]*len(jobs), [not a.no_plan]*len(jobs)))
+        json.dump(results, sys.stdout)
+    sys.stdout.write("\n")
+    return 0
@@ -0,0 +1,16 @@
+"""Paths and environment settings shared by the app, the CLI and batch jobs."""
+import os
+
+PLAN_PATH = "tennis_plan.csv"
+CAT_PATH = "exercise_catalog.csv"
+ASSETS_DIR = "assets"
+
+LOG_BACKEND = os.environ.get("COACH_LOG_BACKEND", "sqlite")   # "sqlite" | "segments"
+LOG_DB_PATH = os.path.join(ASSETS_DIR, "workout_log.db")
+LOG_SEGMENTS_DIR = os.path.join(ASSETS_DIR, "log_segments")
+EXPORT_DIR = os.path.join(ASSETS_DIR, "exports")
+MEDIA_CACHE_DIR = os.path.join(ASSETS_DIR, "media_cache")
+MEDIA_CACHE_MAX_BYTES = int(os.environ.get("COACH_MEDIA_CACHE_MB", "512"))*1024*1024
+MEDIA_OFFLINE = os.environ.get("COACH_OFFLINE", "") not in ("", "0")
+PROFILE = os.environ.get("COACH_PROFILE", "") not in ("", "0")
+PROFILE_PATH = os.environ.get("COACH_PROFILE_FILE", os.path.join(ASSETS_DIR, "profile.jsonl"))
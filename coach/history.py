@@ -0,0 +1,54 @@
+"""Per-exercise history index kept in step with a LogStore."""
+import threading
+from collections import OrderedDict
+import pandas as pd
+
+from .catalog import exercise_key
+from .log_store import LOG_COLUMNS, coerce_log, empty_log, last_rows
+
+HISTORY_CACHE_EXERCISES = 64
+
+class HistoryIndex:
+    """Keyed by exercise_key. The last set of every exercise is always in memory (O(1) lookups);
+    full histories are loaded from the store on first use, kept LRU-bounded and extended in place."""
+    def __init__(self, store):
+        self.store = store; self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._last = self.store.last_per_exercise()
+            self._hist = OrderedDict()
+
+    def add(self, df):
+        df = coerce_log(df)
+        if df.empty: return
+        with self._lock:
+            self._last.update(last_rows(df, self._last))
+            keys = exercise_key(df["exercise"])
+            for key, part in df.groupby(keys, sort=False):
+                if key in self._hist:
+                    h = pd.concat([self._hist[key], part], ignore_index=True)
+                    self._hist[key] = h.sort_values(["datetime","set"], kind="stable").reset_index(drop=True)
+
+    def last(self, name):
+        return self._last.get(exercise_key(name))
+
+    def exercises(self):
+        with self._lock: rows = list(self._last.values())   # shared across sessions; a save may resize _last
+        return sorted(r["exercise"] for r in rows)
+
+    def last_frame(self):
+        """Last set of every exercise as a log frame — all batch_progression needs."""
+        with self._lock: rows = list(self._last.values())
+        return pd.DataFrame(rows, columns=LOG_COLUMNS) if rows else empty_log()
+
+    def history(self, name):
+        key = exercise_key(name)
+        with self._lock:
+            if key in self._hist: self._hist.move_to_end(key); return self._hist[key]
+        h = self.store.history(name)
+        with self._lock:
+            self._hist[key] = h
+            while len(self._hist) > HISTORY_CACHE_EXERCISES: self._hist.popitem(last=False)
+        return h
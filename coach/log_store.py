@@ -0,0 +1,235 @@
+"""Persistent, append-only workout log with pluggable backends (SQLite/WAL or CSV segments)."""
+import io, os, glob, sqlite3, threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+import pandas as pd
+
+from .config import LOG_BACKEND, LOG_DB_PATH, LOG_SEGMENTS_DIR
+from .catalog import exercise_key
+
+LOG_COLUMNS = ["datetime","week","day","exercise","type","set","weight_kg","reps","rir_rpe","work_sec","rest_sec","notes"]
+LOG_INT_COLS = ["set","reps","work_sec","rest_sec"]
+LOG_TEXT_COLS = ["datetime","week","day","exercise","type","rir_rpe","notes"]
+LOG_CHUNK_ROWS = 50_000
+
+def empty_log():
+    return pd.DataFrame(columns=LOG_COLUMNS)
+
+def coerce_log(df):
+    """Align any frame to the log schema with stable dtypes (ints, float weight, text)."""
+    df = df.reindex(columns=LOG_COLUMNS)
+    for c in LOG_INT_COLS: df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0).astype(int)
+    df["weight_kg"] = pd.to_numeric(df["weight_kg"], errors="coerce").fillna(0.0).astype(float)
+    for c in LOG_TEXT_COLS: df[c] = df[c].fillna("").astype(str)
+    return df
+
+class LogStore(ABC):
+    """Append-only log backend. Writes only the new rows; reads stream in chunks.
+    Subclasses implement append/replace/iter_chunks; the rest have scan-based defaults."""
+    @abstractmethod
+    def append(self, df): ...
+    @abstractmethod
+    def replace(self, df): ...
+    @abstractmethod
+    def iter_chunks(self, chunksize=LOG_CHUNK_ROWS): ...
+
+    def read_all(self):
+        frames = list(self.iter_chunks())
+        return pd.concat(frames, ignore_index=True) if frames else empty_log()
+
+    def count(self):
+        return sum(len(c) for c in self.iter_chunks())
+
+    def tail(self, n=30):
+        last = empty_log()
+        for c in self.iter_chunks(): last = pd.concat([last, c], ignore_index=True).tail(n)
+        return last.reset_index(drop=True)
+
+    def exercises(self):
+        seen = set()
+        for c in self.iter_chunks(): seen.update(c["exercise"].unique().tolist())
+        return sorted(seen)
+
+    def history(self, name):
+        key = exercise_key(name)
+        parts = [c[exercise_key(c["exercise"])==key] for c in self.iter_chunks()]
+        parts = [p for p in parts if not p.empty]
+        if not parts: return empty_log()
+        return pd.concat(parts, ignore_index=True).sort_values(["datetime","set"], kind="stable").reset_index(drop=True)
+
+    def existing_keys(self, df):
+        """Those of df's (datetime, exercise_key, set) keys that are already stored; memory is bounded by df."""
+        wanted = set(zip(df["datetime"], exercise_key(df["exercise"]), df["set"])); seen = set()
+        lo, hi = df["datetime"].min(), df["datetime"].max()
+        for c in self.iter_chunks():
+            c = c[c["datetime"].between(lo, hi)]
+            seen.update(k for k in zip(c["datetime"], exercise_key(c["exercise"]), c["set"]) if k in wanted)
+        return seen
+
+    def merge(self, df):
+        """Append only rows whose (datetime, exercise, set) is new — to the log and within df. Returns them."""
+        df = coerce_log(df)
+        keys = pd.Series(list(zip(df["datetime"], exercise_key(df["exercise"]), df["set"])), index=df.index, dtype=object)
+        df = df[~keys.duplicated()]; keys = keys[df.index]
+        if df.empty: return df
+        seen = self.existing_keys(df)
+        new = df[[k not in seen for k in keys]].reset_index(drop=True)
+        if not new.empty: self.append(new)
+        return new
+
+    def last_per_exercise(self):
+        """Last set (by datetime, set, then insertion order) for every exercise key."""
+        last = {}
+        for c in self.iter_chunks(): last.update(last_rows(c, last))
+        return last
+
+def last_rows(df, current=None):
+    """Fold a chunk of log rows into {exercise_key: last row}; ties go to the later row."""
+    current = current or {}; out = {}
+    if df.empty: return out
+    tail = df.assign(_key=exercise_key(df["exercise"])).sort_values(["datetime","set"], kind="stable").groupby("_key", sort=False).tail(1)
+    for key, row in zip(tail["_key"], tail[LOG_COLUMNS].to_dict("records")):
+        cur = out.get(key) or current.get(key)
+        if cur is None or (row["datetime"], row["set"]) >= (cur["datetime"], cur["set"]): out[key] = row
+    return out
+
+class SqliteLogStore(LogStore):
+    """Single SQLite file in WAL mode; one INSERT per saved set, indexed by exercise."""
+    def __init__(self, path=LOG_DB_PATH):
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(path, check_same_thread=False)
+        self._con.execute("PRAGMA journal_mode=WAL"); self._con.execute("PRAGMA synchronous=NORMAL")
+        cols = ", ".join(f'"{c}" {"INTEGER" if c in LOG_INT_COLS else ("REAL" if c=="weight_kg" else "TEXT")}' for c in LOG_COLUMNS)
+        with self._con:
+            self._con.execute(f"CREATE TABLE IF NOT EXISTS log (id INTEGER PRIMARY KEY, exercise_key TEXT, {cols})")
+            self._con.execute('CREATE INDEX IF NOT EXISTS log_exercise ON log (exercise_key, "datetime", "set")')
+            self._con.execute('CREATE INDEX IF NOT EXISTS log_datetime ON log ("datetime", exercise_key, "set")')
+        quoted = ", ".join(f'"{c}"' for c in LOG_COLUMNS)
+        self._select = f"SELECT {quoted} FROM log"
+        self._page = f"SELECT id, {quoted} FROM log WHERE id > ? ORDER BY id LIMIT ?"
+        self._insert = f"INSERT INTO log (exercise_key, {quoted}) VALUES ({', '.join('?'*(len(LOG_COLUMNS)+1))})"
+
+    def _query(self, sql, params=()):
+        with self._lock: df = pd.read_sql_query(sql, self._con, params=params)
+        return coerce_log(df) if not df.empty else empty_log()
+
+    def _insert_rows(self, df):
+        df = coerce_log(df)
+        keys = exercise_key(df["exercise"])
+        self._con.executemany(self._insert, ((k, *row) for k, row in zip(keys, df.itertuples(index=False, name=None))))
+
+    def append(self, df):
+        with self._lock, self._con: self._insert_rows(df)
+
+    def replace(self, df):
+        with self._lock, self._con:
+            self._con.execute("DELETE FROM log"); self._insert_rows(df)
+
+    def iter_chunks(self, chunksize=LOG_CHUNK_ROWS):
+        # keyset pagination on the rowid: each chunk is one indexed range scan
+        last_id = 0
+        while True:
+            with self._lock: rows = self._con.execute(self._page, (last_id, chunksize)).fetchall()
+            if not rows: return
+            last_id = rows[-1][0]
+            yield coerce_log(pd.DataFrame([r[1:] for r in rows], columns=LOG_COLUMNS))
+            if len(rows) < chunksize: return
+
+    def count(self):
+        with self._lock: return self._con.execute("SELECT COUNT(*) FROM log").fetchone()[0]
+
+    def tail(self, n=30):
+        return self._query("SELECT * FROM (SELECT * FROM log ORDER BY id DESC LIMIT ?) ORDER BY id", (n,))
+
+    def exercises(self):
+        with self._lock: return sorted(r[0] for r in self._con.execute('SELECT DISTINCT "exercise" FROM log'))
+
+    def history(self, name):
+        return self._query(f'{self._select} WHERE exercise_key = ? ORDER BY "datetime", "set", id', (exercise_key(name),))
+
+    def existing_keys(self, df):
+        # only df's own keys are looked up: staged in a temp table and probed through the key index
+        keys = zip(df["datetime"], exercise_key(df["exercise"]), (int(s) for s in df["set"]))
+        with self._lock, self._con:
+            self._con.execute('CREATE TEMP TABLE IF NOT EXISTS merge_keys ("datetime" TEXT, exercise_key TEXT, "set" INTEGER)')
+            self._con.execute("DELETE FROM merge_keys"); self._con.executemany("INSERT INTO merge_keys VALUES (?, ?, ?)", keys)
+            rows = self._con.execute('SELECT k."datetime", k.exercise_key, k."set" FROM merge_keys k WHERE EXISTS (SELECT 1 FROM log '
+                                     'WHERE log."datetime" = k."datetime" AND log.exercise_key = k.exercise_key AND log."set" = k."set")').fetchall()
+            self._con.execute("DELETE FROM merge_keys")
+        return set(rows)
+
+    def last_per_exercise(self):
+        df = self._query('SELECT * FROM (SELECT *, ROW_NUMBER() OVER (PARTITION BY exercise_key '
+                         'ORDER BY "datetime" DESC, "set" DESC, id DESC) AS rn FROM log) WHERE rn = 1')
+        return {} if df.empty else dict(zip(exercise_key(df["exercise"]), df.to_dict("records")))
+
+class SegmentLogStore(LogStore):
+    """Append-only CSV segments under assets/; the active segment rolls over every LOG_CHUNK_ROWS rows."""
+    def __init__(self, root=LOG_SEGMENTS_DIR, segment_rows=LOG_CHUNK_ROWS):
+        self.root, self.segment_rows = root, segment_rows
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        segs = self._segments()
+        self._active_rows = self._rows_in(segs[-1]) if segs else 0
+
+    def _segments(self):
+        return sorted(glob.glob(os.path.join(self.root, "seg-*.csv")))
+
+    def _rows_in(self, path):
+        with open(path, encoding="utf-8") as f: return max(0, sum(1 for _ in f)-1)
+
+    def _snapshot(self):
+        """[(segment, size in bytes)] taken under the lock: appends only add whole rows while holding it,
+        so each size ends on a row boundary and readers never see a half-written append."""
+        with self._lock: return [(p, os.path.getsize(p)) for p in self._segments()]
+
+    def _read(self, path, size, chunksize=None):
+        with open(path, "rb") as f: data = f.read(size)
+        return pd.read_csv(io.BytesIO(data), dtype=str, keep_default_na=False, chunksize=chunksize)
+
+    def _write(self, df):
+        # split at segment boundaries, so no segment grows past segment_rows
+        while len(df):
+            segs = self._segments()
+            if not segs or self._active_rows >= self.segment_rows:
+                n = int(os.path.basename(segs[-1])[4:-4])+1 if segs else 1
+                path = os.path.join(self.root, f"seg-{n:06d}.csv"); self._active_rows = 0
+            else: path = segs[-1]
+            part, df = df.iloc[:self.segment_rows-self._active_rows], df.iloc[self.segment_rows-self._active_rows:]
+            part.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+            self._active_rows += len(part)
+
+    def append(self, df):
+        with self._lock: self._write(coerce_log(df))
+
+    def replace(self, df):
+        with self._lock:
+            for p in self._segments(): os.remove(p)
+            self._active_rows = 0; self._write(coerce_log(df))
+
+    def iter_chunks(self, chunksize=LOG_CHUNK_ROWS):
+        for p, size in self._snapshot():
+            for c in self._read(p, size, chunksize): yield coerce_log(c)
+
+    def tail(self, n=30):
+        parts, got = [], 0
+        for p, size in reversed(self._snapshot()):
+            part = self._read(p, size).tail(n-got); parts.insert(0, part); got += len(part)
+            if got >= n: break
+        return coerce_log(pd.concat(parts, ignore_index=True)) if parts else empty_log()
+
+LOG_BACKENDS = {"sqlite": SqliteLogStore, "segments": SegmentLogStore}
+
+def open_log_store(backend=None, **kw):
+    return LOG_BACKENDS[backend or LOG_BACKEND](**kw)
+
+def log_rows(week, day, ex_name, ex_type, rows, now=None):
+    """Log frame for one save: every row shares the save timestamp."""
+    now = now or datetime.now().isoformat(timespec="seconds")
+    new = []
+    for r in rows:
+        new.append({"datetime":now,"week":week,"day":day,"exercise":ex_name,"type":ex_type,
+                    "set":r.get("set",1),"weight_kg":r.get("weight_kg",0.0),"reps":r.get("reps",0),
+                    "rir_rpe":r.get("rir_rpe",""),"work_sec":r.get("work_sec",0),"rest_sec":r.get("rest_sec",0),
+                    "notes":r.get("notes","")})
+    return pd.DataFrame(new, columns=LOG_COLUMNS)
@@ -0,0 +1,119 @@
+"""Content-addressed local media cache with thumbnails and LRU eviction."""
+import os, re, json, time, shutil, hashlib, threading, subprocess, urllib.request
+from urllib.parse import urlparse
+
+try:
+    from PIL import Image   # optional: thumbnails for cached images
+except ImportError:
+    Image = None
+
+from .config import MEDIA_CACHE_DIR, MEDIA_CACHE_MAX_BYTES
+
+MEDIA_MAX_OBJECT_BYTES = 64*1024*1024
+VIDEO_EXTS = (".mp4",".mov",".m4v",".webm")
+THUMB_SIZE = (320, 180)
+MEDIA_INDEX_SAVE_SEC = 30   # get() recency is flushed to index.json at most this often
+
+def _fetch_url(url):
+    with urllib.request.urlopen(url, timeout=20) as r: return r.read(MEDIA_MAX_OBJECT_BYTES+1)
+
+class MediaCache:
+    """Media stored once per content hash under objects/<sha[:2]>/, with index.json mapping each
+    source (URL or path) → {sha, path, size, kind, thumb, used}. Least-recently-used sources are
+    evicted past max_bytes. YouTube can't be downloaded, so only its poster frame is cached."""
+    def __init__(self, root=MEDIA_CACHE_DIR, max_bytes=MEDIA_CACHE_MAX_BYTES, fetch=_fetch_url):
+        self.root, self.max_bytes, self.fetch = root, max_bytes, fetch
+        self._lock = threading.Lock(); self._index_path = os.path.join(root, "index.json"); self._saved = time.time()
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        try:
+            with open(self._index_path, encoding="utf-8") as f: self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+
+    def _save(self):
+        tmp = self._index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f: json.dump(self.index, f)
+        os.replace(tmp, self._index_path); self._saved = time.time()
+
+    def _abs(self, rel):
+        return os.path.join(self.root, rel) if rel else ""
+
+    def _read_source(self, source):
+        vid = youtube_id(source)
+        if vid: return self.fetch(f"https://img.youtube.com/vi/{vid}/hqdefault.jpg"), ".jpg", "poster"
+        if os.path.exists(source):
+            if os.path.getsize(source) > MEDIA_MAX_OBJECT_BYTES: raise ValueError(f"{source} is larger than {MEDIA_MAX_OBJECT_BYTES} bytes")
+            with open(source, "rb") as f: data = f.read()
+        else: data = self.fetch(source)
+        if len(data) > MEDIA_MAX_OBJECT_BYTES: raise ValueError(f"{source} is larger than {MEDIA_MAX_OBJECT_BYTES} bytes")
+        ext = os.path.splitext(urlparse(source).path)[1].lower() or ".bin"
+        return data, ext, "video" if ext in VIDEO_EXTS else "image"
+
+    def _thumbnail(self, path, kind):
+        out = os.path.splitext(path)[0] + ".thumb.jpg"
+        if os.path.exists(out): return out
+        try:
+            if kind=="video":
+                if not shutil.which("ffmpeg"): return ""
+                subprocess.run(["ffmpeg","-y","-loglevel","error","-ss","1","-i",path,"-frames:v","1","-vf",f"scale={THUMB_SIZE[0]}:-2",out],
+                               check=True, timeout=60)
+            elif Image is not None:
+                with Image.open(path) as im:
+                    im.thumbnail(THUMB_SIZE); im.convert("RGB").save(out, "JPEG", quality=80)
+            else: return ""
+        except Exception:
+            return ""
+        return out if os.path.exists(out) else ""
+
+    def ingest(self, source):
+        """Copy one media source into the cache (no-op if already cached) and return its entry."""
+        source = str(source).strip()
+        hit = self.get(source)
+        if hit: return hit
+        data, ext, kind = self._read_source(source)
+        if len(data) > self.max_bytes: raise ValueError(f"{source} ({len(data)} bytes) does not fit in the cache ({self.max_bytes} bytes)")
+        sha = hashlib.sha256(data).hexdigest()
+        path = os.path.join(self.root, "objects", sha[:2], sha + ext)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + ".tmp", "wb") as f: f.write(data)
+            os.replace(path + ".tmp", path)
+        thumb = self._thumbnail(path, kind) or (path if kind=="poster" else "")
+        with self._lock:
+            self.index[source] = {"sha":sha, "path":os.path.relpath(path, self.root), "size":len(data), "kind":kind,
+                                  "thumb":os.path.relpath(thumb, self.root) if thumb else "", "used":time.time()}
+            self._evict(); self._save()
+        return self.get(source, touch=False)
+
+    def get(self, source, touch=True):
+        """Entry with absolute paths, or None if not cached (or its file went missing)."""
+        e = self.index.get(str(source).strip())
+        if e is None or not os.path.exists(self._abs(e["path"])): return None
+        if touch:
+            e["used"] = time.time()
+            if e["used"] - self._saved > MEDIA_INDEX_SAVE_SEC:   # debounced, so LRU order survives restarts
+                with self._lock: self._save()
+        return {**e, "path":self._abs(e["path"]), "thumb":self._abs(e["thumb"])}
+
+    def total_bytes(self):
+        objs = {e["sha"]: e for e in self.index.values()}
+        return sum(e["size"] for e in objs.values())
+
+    def _evict(self):
+        while self.index and self.total_bytes() > self.max_bytes:
+            src = min(self.index, key=lambda k: self.index[k]["used"])
+            e = self.index.pop(src)
+            if not any(o["sha"]==e["sha"] for o in self.index.values()):
+                for rel in (e["path"], e["thumb"]):
+                    if rel and os.path.exists(self._abs(rel)): os.remove(self._abs(rel))
+
+    def ingest_all(self, sources):
+        """(cached, {source: error}) for a batch such as every catalog media_url."""
+        ok, failed = 0, {}
+        for src in dict.fromkeys(s for s in sources if s and str(s).strip()):
+            try: self.ingest(src); ok += 1
+            except Exception as e: failed[src] = str(e)
+        return ok, failed
+
+def youtube_id(url):
+    m = re.search(r"(?:v=|youtu\.be/|embed/|shorts/)([\w-]{11})", str(url)); return m.group(1) if m else None
@@ -0,0 +1,31 @@
+"""Opt-in per-rerun timings: named sections, summed per rerun, optionally appended to a JSONL file."""
+import os, json, time
+from contextlib import contextmanager
+from datetime import datetime
+
+class RerunProfiler:
+    """Collects {section: (ms, calls)} for one rerun. Disabled, section() costs one branch."""
+    def __init__(self, enabled=False, path=None):
+        self.enabled, self.path = enabled, path
+        self.sections = {}; self._t0 = time.perf_counter()
+
+    @contextmanager
+    def section(self, name):
+        if not self.enabled:
+            yield; return
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            ms, n = self.sections.get(name, (0.0, 0))
+            self.sections[name] = (ms + (time.perf_counter()-t)*1000, n+1)
+
+    def finish(self, **meta):
+        """The rerun's record (also written to `path` if set), or None when disabled."""
+        if not self.enabled: return None
+        rec = {"ts": datetime.now().isoformat(timespec="seconds"), "total_ms": round((time.perf_counter()-self._t0)*1000, 2), **meta,
+               "sections": {k: {"ms": round(ms, 2), "calls": n} for k, (ms, n) in self.sections.items()}}
+        if self.path:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f: f.write(json.dumps(rec) + "\n")
+        return rec
@@ -0,0 +1,143 @@
+"""Declarative periodization specs and the engine that compiles them into plan tables."""
+import json, hashlib, threading
+from collections import OrderedDict
+
+# A spec is plain JSON-able data:
+#   phases: [{"name", "label"?, "weeks", "stages": [{"name", "weeks"?}, ...]}]  — one stage may omit "weeks" and
+#           takes the remainder, so deload/taper weeks stay put when a block is lengthened or shortened;
+#           the compiled plan's Phase column is the label (or the name)
+#   days:   [{"name", "slots": [{"exercise", "type", "protocol"}]}]
+# A slot's protocol is a string, or a dict looked up as "Phase/stage", then "Phase", then "*".
+PLAN_COLUMNS = ["Week","Day","Exercise","Type","Protocol","Phase","Stage"]
+PROGRAM_CACHE_SIZE = 1024
+TENNIS_STAGES = ("Base/intro","Base/main","Build/main","Build/deload","Peak/main","Peak/taper")
+
+def _by_stage(*protocols):
+    return dict(zip(TENNIS_STAGES, protocols))
+
+# 12-week plan with Base/Build/Peak progression (3 days/week)
+TENNIS_PROGRAM = {
+    "name": "Tennis 12-week",
+    "phases": [
+        {"name":"Base",  "label":"Base (capacity)",    "weeks":4, "stages":[{"name":"intro","weeks":2}, {"name":"main"}]},
+        {"name":"Build", "label":"Build (intensity)",  "weeks":4, "stages":[{"name":"main"}, {"name":"deload","weeks":1}]},
+        {"name":"Peak",  "label":"Peak (power/speed)", "weeks":4, "stages":[{"name":"main"}, {"name":"taper","weeks":1}]},
+    ],
+    "days": [
+        {"name":"Day A (Power/Lower)", "slots":[
+            {"exercise":"Goblet Squat", "type":"load", "protocol":_by_stage(
+                "4x10-12 @60-70% | Rest 75s", "4x10-12 @65-75% | Rest 75s", "4x8-10 @70-80% | Rest 90s",
+                "3x8-10 @65-75% | Rest 75s", "5x6-8 @75-85% (explosive concentric) | Rest 120s", "3x6-8 @70% | Rest 90s (taper)")},
+            {"exercise":"Bulgarian Split Squat (Smith)", "type":"load", "protocol":_by_stage(
+                "3x10/leg | Rest 75s", "4x8-10/leg | Rest 75s", "4x8-10/leg | Rest 90s",
+                "3x8-10/leg | Rest 75s", "4x6-8/leg (explosive up) | Rest 90s", "3x8/leg | Rest 75s")},
+            {"exercise":"Dumbbell Romanian Deadlift", "type":"load", "protocol":_by_stage(
+                "4x8-10 | Rest 90s", "4x8-10 (slow 3s down) | Rest 90s", "4x8 @75-80% | Rest 90s",
+                "3x8 @70% | Rest 75s", "4x6-8 (pause 1s at stretch) | Rest 120s", "3x6-8 @70% | Rest 90s")},
+            {"exercise":"Jump Squat", "type":"time", "protocol":_by_stage(
+                "3x30s work / 30s rest", "4x25s work / 35s rest", "4x20s work / 40s rest (max height)",
+                "3x20s work / 40s rest", "4x15-20s work / 60s rest (max quality)", "3x15s work / 60s rest")},
+            {"exercise":"Side Plank Rotation", "type":"time", "protocol":_by_stage(
+                "3x30-40s/side", "3x35-45s/side", "3x40s/side", "3x30-40s/side", "3x45-60s/side", "3x40s/side")},
+        ]},
+        {"name":"Day B (Agility/Core)", "slots":[
+            {"exercise":"Ladder/Quick Feet (Cone Drill)", "type":"time", "protocol":_by_stage(
+                "5x30s work / 30s rest (fast feet)", "6x30s work / 25s rest (progress speed)", "8x20s work / 20s rest (change patterns)",
+                "6x20s work / 25s rest (deload)", "10x15s work / 30s rest (max quality)", "6x15s work / 30s rest (taper)")},
+            {"exercise":"Lunge with Twist (DB)", "type":"load", "protocol":_by_stage(
+                "3x10/side | Rest 60s", "4x10/side | Rest 60s", "4x12/side | Rest 60s",
+                "3x10/side | Rest 60s", "3x8/side (controlled) | Rest 60s", "2x8/side | Rest 60s")},
+            {"exercise":"Dumbbell Slam / Speed Swing", "type":"time", "protocol":_by_stage(
+                "4x20s work / 40s rest (med ball or DB swing)", "5x20s work / 40s rest", "6x15-20s work / 40s rest (max power)",
+                "4x15-20s work / 45s rest", "6x10-15s work / 60s rest (max intent)", "4x10s work / 60s rest")},
+            {"exercise":"Lat Pulldown", "type":"load", "protocol":_by_stage(
+                "4x10-12 | Rest 75s", "4x10-12 (2s down) | Rest 75s", "4x8-10 @70-80% | Rest 90s",
+                "3x10 @65-70% | Rest 75s", "5x6-8 @75-85% | Rest 120s", "3x8 @70% | Rest 90s")},
+            {"exercise":"Russian Twist", "type":"load", "protocol":_by_stage(
+                "3x20 | Rest 45s", "3x24 | Rest 45s", "4x20 weighted | Rest 60s",
+                "3x16-20 | Rest 45s", "3x16-20 (slow control) | Rest 45s", "2x16 | Rest 45s")},
+        ]},
+        {"name":"Day C (Upper/Stability)", "slots":[
+            {"exercise":"Push Press (DB/Smith)", "type":"load", "protocol":_by_stage(
+                "4x6-8 | Rest 90s", "5x6-8 | Rest 90s", "5x5-6 (explosive) | Rest 120s",
+                "3x6 (deload) | Rest 90s", "6x3-5 (speed focus) | Rest 120s", "3x3-5 (taper) | Rest 120s")},
+            {"exercise":"Dumbbell Bench Press", "type":"load", "protocol":_by_stage(
+                "3x10 | Rest 75s", "4x8-10 | Rest 75s", "4x8-10 @70-80% | Rest 90s",
+                "3x8-10 @65-70% | Rest 75s", "3x6-8 (controlled) | Rest 90s", "2x8 light | Rest 60s")},
+            {"exercise":"Single-arm Dumbbell Row", "type":"load", "protocol":_by_stage(
+                "3x12/side | Rest 60s", "4x10-12/side | Rest 60s", "4x8-10/side @70-80% | Rest 90s",
+                "3x10/side | Rest 75s", "3x8-10/side (strict) | Rest 90s", "2x8/side light | Rest 60s")},
+            {"exercise":"Shoulder External Rotation", "type":"load", "protocol":_by_stage(
+                "3x15 light | Rest 45s", "3x15-20 light | Rest 45s", "4x15 (slow) | Rest 45s",
+                "3x15 | Rest 45s", "3x15-20 (prehab) | Rest 45s", "2x15 | Rest 45s")},
+            {"exercise":"Farmer Carry", "type":"time", "protocol":_by_stage(
+                "3x40m walk (core braced)", "4x40m walk", "4x50m heavy walk", "3x40m walk", "4x60m heavy walk", "2x40m easy walk")},
+        ]},
+    ],
+}
+
+def spec_hash(spec):
+    return hashlib.sha1(json.dumps(spec, sort_keys=True, separators=(",",":")).encode("utf-8")).hexdigest()
+
+def program_weeks(spec):
+    """[(week_no, phase, stage)] for every week of the program."""
+    out, wn = [], 1
+    for ph in spec["phases"]:
+        n = int(ph["weeks"]); stages = ph.get("stages") or [{"name":"main"}]
+        fixed = sum(int(s["weeks"]) for s in stages if "weeks" in s)
+        flex = [s for s in stages if "weeks" not in s]
+        if len(flex) > 1 or fixed > n or (not flex and fixed != n):
+            raise ValueError(f"Stages of phase {ph['name']!r} do not add up to {n} weeks")
+        for s in stages:
+            for _ in range(int(s["weeks"]) if "weeks" in s else n-fixed):
+                out.append((wn, ph["name"], s["name"])); wn += 1
+    return out
+
+def slot_protocol(slot, phase, stage):
+    p = slot["protocol"]
+    if isinstance(p, str): return p
+    for k in (f"{phase}/{stage}", phase, "*"):
+        if k in p: return p[k]
+    raise ValueError(f"No protocol for {slot['exercise']!r} in {phase}/{stage}")
+
+def _compile(spec):
+    import pandas as pd   # deferred: specs, hashes and phase lookups don't need pandas
+    rows = []; labels = {ph["name"]: ph.get("label") or ph["name"] for ph in spec["phases"]}
+    for wn, phase, stage in program_weeks(spec):
+        for d in spec["days"]:
+            rows += [[f"Week {wn}", d["name"], s["exercise"], s.get("type","load"), slot_protocol(s, phase, stage), labels[phase], stage]
+                     for s in d["slots"]]
+    return pd.DataFrame(rows, columns=PLAN_COLUMNS)
+
+_program_cache = OrderedDict()
+_program_lock = threading.Lock()
+
+def compile_program(spec):
+    """Plan table (PLAN_COLUMNS) for a spec, memoized by spec hash."""
+    key = spec_hash(spec)
+    with _program_lock:
+        if key in _program_cache: _program_cache.move_to_end(key); return _program_cache[key].copy()
+    plan = _compile(spec)
+    with _program_lock:
+        _program_cache[key] = plan
+        while len(_program_cache) > PROGRAM_CACHE_SIZE: _program_cache.popitem(last=False)
+    return plan.copy()
+
+def derive_program(spec, name=None, phase_weeks=None, days=None, swaps=None):
+    """Personalized copy of a spec: other block lengths ({phase: weeks}), a subset/reordering of
+    day names, and exercise swaps ({old: new})."""
+    out = json.loads(json.dumps(spec))
+    if name: out["name"] = name
+    for ph in out["phases"]: ph["weeks"] = int((phase_weeks or {}).get(ph["name"], ph["weeks"]))
+    if days is not None:
+        by_name = {d["name"]: d for d in out["days"]}
+        out["days"] = [by_name[d] for d in days]
+    for d in out["days"]:
+        for s in d["slots"]: s["exercise"] = (swaps or {}).get(s["exercise"], s["exercise"])
+    return out
+
+def phase_for_week(wn:int):
+    """Phase label of the default 12-week split; only for plans compiled before the Phase column existed."""
+    if wn<=4: return "Base (capacity)"
+    if wn<=8: return "Build (intensity)"
+    return "Peak (power/speed)"
@@ -0,0 +1,82 @@
+"""Progression rules: scalar suggestions and the vectorized batch engine."""
+import numpy as np
+import pandas as pd
+
+from .catalog import exercise_key
+from .log_store import coerce_log
+from .protocol import RPE_PATTERN
+
+def suggest_next_load(last_weight,last_reps,rep_low,rep_high,inc):
+    rep_low = rep_low if pd.notna(rep_low) and rep_low>0 else 8
+    rep_high = rep_high if pd.notna(rep_high) and rep_high>0 else 12
+    inc = inc if pd.notna(inc) and inc>0 else 2.5
+    last_weight = last_weight if pd.notna(last_weight) else 0.0
+    last_reps = last_reps if pd.notna(last_reps) else rep_low
+    if last_reps>=rep_high: return round(max(0.0,last_weight+inc),1), f"Reached {last_reps} ≥ {rep_high} → **+{inc} kg**"
+    if last_reps<rep_low:  return round(max(0.0,last_weight-inc),1), f"Below {rep_low} → **-{inc} kg**"
+    return round(last_weight,1), "In target range → keep weight, add 1–2 reps"
+
+def suggest_next_interval(last_work,last_rest,rpe_hint=6):
+    work = int(last_work or 30); rest = int(last_rest or 30)
+    if rpe_hint<=6: return work+5, max(0,rest-5), "Easy → **+5s work / -5s rest**"
+    if rpe_hint>=8: return max(5,work-5), rest+5, "Hard → **-5s work / +5s rest**"
+    return work, rest, "Maintain"
+
+PROGRESSION_COLUMNS = ["athlete","exercise","type","last_datetime","last_weight_kg","last_reps","last_work_sec","last_rest_sec",
+                       "rpe","next_weight_kg","next_work_sec","next_rest_sec","reason"]
+
+def _catalog_col(keys, catalog, col, default):
+    # object dtype keeps the catalog's own int/float values, so reason text matches the scalar path
+    if catalog is None or catalog.empty: return pd.Series(default, index=keys.index, dtype=object)
+    m = keys.map(catalog.drop_duplicates("exercise_key").set_index("exercise_key")[col].astype(object))
+    return m.where(m.notna(), default).astype(object)
+
+def batch_progression(log, catalog=None, rpe_default=6):
+    """Next load / interval for every (athlete, exercise) in a log frame, in one vectorized pass.
+    Same rules, numbers and reason text as suggest_next_load / suggest_next_interval on the last set.
+    Logs without an "athlete" column are treated as one athlete ("")."""
+    if log.empty: return pd.DataFrame(columns=PROGRESSION_COLUMNS)
+    df = coerce_log(log).assign(athlete=log["athlete"].fillna("").astype(str).values if "athlete" in log else "")
+    df["exercise_key"] = exercise_key(df["exercise"])
+    last = df.sort_values(["datetime","set"], kind="stable").drop_duplicates(["athlete","exercise_key"], keep="last")
+    last = last.sort_values(["athlete","exercise_key"], kind="stable").reset_index(drop=True)
+    keys, is_load = last["exercise_key"], last["type"].eq("load")
+
+    # --- load rules (catalog values, then suggest_next_load's own defaults for missing/≤0)
+    lo, hi, inc = (_catalog_col(keys, catalog, c, d) for c, d in (("rep_low",8),("rep_high",12),("increment_kg",2.5)))
+    lo, hi, inc = (v.where(pd.to_numeric(v, errors="coerce").gt(0), d) for v, d in ((lo,8),(hi,12),(inc,2.5)))
+    lo_n, hi_n, inc_n = (pd.to_numeric(v).astype(float) for v in (lo, hi, inc))
+    w, reps = last["weight_kg"].astype(float), last["reps"]
+    up, down = reps.ge(hi_n), reps.lt(lo_n)
+    raw = np.where(up, w+inc_n, np.where(down, w-inc_n, w))
+    next_w = [round(max(0.0, x), 1) if u or d else round(x, 1) for x, u, d in zip(raw, up, down)]
+    load_why = np.where(up, "Reached " + reps.astype(str) + " ≥ " + hi.astype(str) + " → **+" + inc.astype(str) + " kg**",
+               np.where(down, "Below " + lo.astype(str) + " → **-" + inc.astype(str) + " kg**", "In target range → keep weight, add 1–2 reps"))
+
+    # --- interval rules (±5s by logged RPE)
+    m = last["rir_rpe"].str.extract(RPE_PATTERN)
+    v = pd.to_numeric(m[1], errors="coerce")
+    rpe = (10-v).where(m[0].str.lower().eq("rir"), v).fillna(rpe_default)
+    work = last["work_sec"].where(last["work_sec"]!=0, 30); rest = last["rest_sec"].where(last["rest_sec"]!=0, 30)
+    easy, hard = rpe.le(6), rpe.ge(8)
+    next_work = np.where(easy, work+5, np.where(hard, np.maximum(5, work-5), work))
+    next_rest = np.where(easy, np.maximum(0, rest-5), np.where(hard, rest+5, rest))
+    int_why = np.where(easy, "Easy → **+5s work / -5s rest**", np.where(hard, "Hard → **-5s work / +5s rest**", "Maintain"))
+
+    return pd.DataFrame({
+        "athlete": last["athlete"], "exercise": last["exercise"], "type": last["type"], "last_datetime": last["datetime"],
+        "last_weight_kg": w, "last_reps": reps, "last_work_sec": last["work_sec"], "last_rest_sec": last["rest_sec"], "rpe": rpe,
+        "next_weight_kg": pd.Series(next_w, dtype=float).where(is_load),
+        "next_work_sec": pd.Series(next_work).where(~is_load), "next_rest_sec": pd.Series(next_rest).where(~is_load),
+        "reason": np.where(is_load, load_why, int_why),
+    }, columns=PROGRESSION_COLUMNS)
+
+def interval_phase(elapsed, work, rest, rounds):
+    """(round, "WORK" | "REST" | "DONE", seconds left in phase, rounds completed) after `elapsed` seconds.
+    A round is completed when its WORK ends; there is no rest after the last round."""
+    period = max(1, work+rest); idx = int(elapsed // period)
+    if idx >= rounds: return rounds, "DONE", 0, rounds
+    into = elapsed - idx*period
+    if into < work: return idx+1, "WORK", work-into, idx
+    if idx+1 >= rounds: return rounds, "DONE", 0, rounds
+    return idx+1, "REST", period-into, idx+1
@@ -0,0 +1,56 @@
+"""Parsing of plan Protocol strings and logged RIR/RPE notes."""
+import re
+from functools import lru_cache
+
+# Numbers default to 0 ("not prescribed"), matching the catalog convention.
+PROTOCOL_COLUMNS = ["sets","rep_low","rep_high","pct_low","pct_high","work_sec","work_sec_high","rest_sec","distance_m","per","modifiers"]
+_PROTO_HEAD = re.compile(r"^\s*(\d+)\s*x\s*(\d+)(?:\s*-\s*(\d+))?\s*(s|m)?\b", re.I)
+_PROTO_PER = re.compile(r"/\s*(leg|side|arm)\b", re.I)
+_PROTO_PCT = re.compile(r"@\s*(\d+)(?:\s*-\s*(\d+))?\s*%")
+_PROTO_REST = re.compile(r"\brest\s*(\d+)\s*s\b|(\d+)\s*s\s*rest\b", re.I)
+_PROTO_NOTE = re.compile(r"\(([^)]*)\)")
+_PROTO_FILLER = re.compile(r"\bwork\b|[|/]", re.I)
+RPE_PATTERN = re.compile(r"(rir|rpe)?\s*@?\s*(\d+(?:\.\d+)?)", re.I)   # shared with batch_progression, so both read effort alike
+
+@lru_cache(maxsize=4096)
+def parse_protocol(text):
+    """Tuple in PROTOCOL_COLUMNS order. Seconds after the set count are work time, metres distance,
+    a bare number reps; parentheticals and leftover words become modifiers."""
+    text = str(text or ""); rest = text
+    sets = lo = hi = pct_lo = pct_hi = work = work_hi = rest_sec = dist = 0; per = ""; notes = []
+    m = _PROTO_HEAD.search(text)
+    if m:
+        sets, a = int(m.group(1)), int(m.group(2)); b = int(m.group(3) or a); unit = (m.group(4) or "").lower()
+        if unit=="s": work, work_hi = a, b
+        elif unit=="m": dist = a
+        else: lo, hi = a, b
+        rest = rest.replace(m.group(0), " ", 1)
+    for rx in (_PROTO_PER, _PROTO_PCT, _PROTO_REST):
+        m = rx.search(rest)
+        if not m: continue
+        if rx is _PROTO_PER: per = m.group(1).lower()
+        elif rx is _PROTO_PCT: pct_lo = int(m.group(1)); pct_hi = int(m.group(2) or pct_lo)
+        else: rest_sec = int(m.group(1) or m.group(2))
+        rest = rest.replace(m.group(0), " ", 1)
+    notes = [n.strip() for n in _PROTO_NOTE.findall(rest)]
+    left = " ".join(_PROTO_FILLER.sub(" ", _PROTO_NOTE.sub(" ", rest)).split())
+    modifiers = "; ".join(([left] if left else []) + [n for n in notes if n])
+    return (sets, lo, hi, pct_lo, pct_hi, work, work_hi, rest_sec, dist, per, modifiers)
+
+def protocol_summary(r):
+    """One-line reading of a parsed plan row, e.g. "4 sets · 10–12 reps · 60–70% 1RM · rest 75s"."""
+    rng = lambda a, b, unit="": f"{a}{unit}" if a==b else f"{a}–{b}{unit}"
+    parts = [f"{r.sets} sets"]
+    if r.rep_low: parts.append(rng(r.rep_low, r.rep_high) + " reps" + (f"/{r.per}" if r.per else ""))
+    if r.work_sec: parts.append(rng(r.work_sec, r.work_sec_high, "s") + " work" + (f"/{r.per}" if r.per else ""))
+    if r.distance_m: parts.append(f"{r.distance_m} m")
+    if r.pct_low: parts.append(rng(r.pct_low, r.pct_high, "%") + " 1RM")
+    if r.rest_sec: parts.append(f"rest {r.rest_sec}s")
+    return " · ".join(parts)
+
+def rpe_hint(rir_rpe, default=6):
+    """Logged effort as RPE: "RPE8" / "@8" / "8" as-is, "RIR2" → 8; unparseable → default."""
+    m = RPE_PATTERN.search(str(rir_rpe or ""))
+    if not m: return default
+    v = float(m.group(2))
+    return 10-v if (m.group(1) or "").lower()=="rir" else v
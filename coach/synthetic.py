@@ -0,0 +1,31 @@
+"""Synthetic workout logs for benchmarks and load tests."""
+import numpy as np
+import pandas as pd
+
+from .log_store import LOG_COLUMNS
+
+def synthetic_log(rows, exercises=40, weeks=12, athletes=1, start="2024-01-01", seed=0):
+    """`rows` plausible set rows over `weeks` weeks, in time order; ~30% of exercises are timed.
+    With athletes > 1 an "athlete" column is added in front (batch_progression groups on it)."""
+    rng = np.random.default_rng(seed)
+    names = np.array([f"Exercise {i:03d}" for i in range(exercises)])
+    timed = rng.random(exercises) < 0.3
+    ex = rng.integers(0, exercises, rows); is_time = timed[ex]
+    secs = np.sort(rng.integers(0, weeks*7*86400, rows))
+    df = pd.DataFrame({
+        "datetime": (pd.Timestamp(start) + pd.to_timedelta(secs, unit="s")).strftime("%Y-%m-%dT%H:%M:%S"),
+        "week": "Week " + pd.Series(secs // (7*86400) + 1).astype(str),
+        "day": np.array(["Day A","Day B","Day C"])[rng.integers(0, 3, rows)],
+        "exercise": names[ex],
+        "type": np.where(is_time, "time", "load"),
+        "set": rng.integers(1, 6, rows),
+        "weight_kg": np.where(is_time, 0.0, rng.integers(4, 60, rows)*2.5),
+        "reps": np.where(is_time, 0, rng.integers(4, 16, rows)),
+        "rir_rpe": np.array(["RIR1","RIR2","RIR3","RPE 8",""])[rng.integers(0, 5, rows)],
+        "work_sec": np.where(is_time, rng.integers(2, 9, rows)*5, 0),
+        "rest_sec": rng.integers(2, 19, rows)*5,
+        "notes": "",
+    }, columns=LOG_COLUMNS)
+    if athletes > 1:
+        df.insert(0, "athlete", np.array([f"athlete-{i:03d}" for i in range(athletes)])[rng.integers(0, athletes, rows)])
+    return df
@@ -0,0 +1,79 @@
+"""Streamed log export and chunked, validated merge-import."""
+import os, glob, gzip, time, uuid
+import pandas as pd
+
+try:
+    import pyarrow as pa, pyarrow.parquet as pq   # optional: Parquet export/import
+except ImportError:
+    pa = pq = None
+
+from .config import EXPORT_DIR
+from .log_store import LOG_COLUMNS, LOG_INT_COLS, coerce_log, empty_log
+
+EXPORT_TTL_SEC = 24*3600
+EXPORT_FORMATS = {"CSV":".csv", "CSV (gzip)":".csv.gz", "Parquet":".parquet"}
+EXPORT_MIME = {"CSV":"text/csv", "CSV (gzip)":"application/gzip", "Parquet":"application/vnd.apache.parquet"}
+IMPORT_CHUNK_ROWS = 20_000
+LOG_REQUIRED = ["datetime","exercise","set"]
+
+def export_formats():
+    return [f for f in EXPORT_FORMATS if f!="Parquet" or pq is not None]
+
+def export_log(store, fmt, path):
+    """Write the log to `path` one store chunk at a time (bounded memory); returns rows written."""
+    n = 0
+    if fmt=="Parquet":
+        if pq is None: raise ValueError("Parquet export needs pyarrow")
+        schema = pa.schema([(c, pa.int64() if c in LOG_INT_COLS else (pa.float64() if c=="weight_kg" else pa.string())) for c in LOG_COLUMNS])
+        with pq.ParquetWriter(path, schema) as w:
+            for c in store.iter_chunks(): w.write_table(pa.Table.from_pandas(c, schema=schema, preserve_index=False)); n += len(c)
+        return n
+    with (gzip.open if path.endswith(".gz") else open)(path, "wt", encoding="utf-8", newline="") as f:
+        empty_log().to_csv(f, index=False)   # header, even for an empty log
+        for c in store.iter_chunks(): c.to_csv(f, header=False, index=False); n += len(c)
+    return n
+
+def prepare_export(store, fmt):
+    """Export into a fresh file under assets/exports/ (older exports are pruned)."""
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    for p in glob.glob(os.path.join(EXPORT_DIR, "*")):
+        if time.time()-os.path.getmtime(p) > EXPORT_TTL_SEC: os.remove(p)
+    path = os.path.join(EXPORT_DIR, f"workout_log-{uuid.uuid4().hex[:8]}{EXPORT_FORMATS[fmt]}")
+    return path, export_log(store, fmt, path)
+
+def read_log_chunks(f, name, chunksize=IMPORT_CHUNK_ROWS):
+    """Raw chunks of an uploaded log (CSV, gzipped CSV or Parquet), everything as text."""
+    if name.lower().endswith(".parquet"):
+        if pq is None: raise ValueError("Parquet import needs pyarrow")
+        for b in pq.ParquetFile(f).iter_batches(batch_size=chunksize): yield b.to_pandas().astype("string").fillna("").astype(str)   # nulls → "", as in the CSV path
+        return
+    yield from pd.read_csv(f, chunksize=chunksize, dtype=str, keep_default_na=False,
+                           compression="gzip" if name.lower().endswith(".gz") else None)
+
+def validate_log_chunk(raw):
+    """(rows coerced to the log schema, number rejected). Raises ValueError if key columns are missing."""
+    missing = [c for c in LOG_REQUIRED if c not in raw.columns]
+    if missing: raise ValueError(f"not a workout log — missing column(s): {', '.join(missing)}")
+    raw = raw.reindex(columns=LOG_COLUMNS).fillna("")
+    when = pd.to_datetime(raw["datetime"].str.strip(), errors="coerce", format="ISO8601")
+    ok = when.notna() & raw["exercise"].str.strip().ne("") & raw["type"].isin(["", "load", "time"])
+    for c in LOG_INT_COLS + ["weight_kg"]:
+        v = raw[c].str.strip(); n = pd.to_numeric(v, errors="coerce")
+        # ints must be whole ("8", "8.0"): truncating "1.9" to set 1 would collide with the real set 1 and vanish as a dupe
+        ok &= v.eq("") | (n.notna() if c=="weight_kg" else n.mod(1).eq(0))
+    ok &= pd.to_numeric(raw["set"], errors="coerce").notna()
+    df = raw[ok].copy()
+    df["datetime"] = when[ok].dt.strftime("%Y-%m-%dT%H:%M:%S")
+    df["type"] = df["type"].where(df["type"].ne(""), "load")
+    return coerce_log(df), int((~ok).sum())
+
+def import_log(store, f, name, on_insert=()):
+    """Chunked, validated merge of an uploaded log into the store; returns (added, duplicates, rejected).
+    Each chunk's newly inserted rows are passed to the on_insert callbacks."""
+    added = dupes = rejected = 0
+    for raw in read_log_chunks(f, name):
+        df, bad = validate_log_chunk(raw); rejected += bad
+        new = store.merge(df); added += len(new); dupes += len(df)-len(new)
+        if not new.empty:
+            for cb in on_insert: cb(new)
+    return added, dupes, rejected
@@ -0,0 +1,22 @@
+"""TrainingAggregates: incremental adds match a full rebuild, and program cycles don't merge."""
+import pandas as pd
+
+from coach.analytics import TrainingAggregates
+from coach.log_store import open_log_store, log_rows
+from coach.synthetic import synthetic_log
+
+def test_incremental_matches_rebuild(tmp_path):
+    log = synthetic_log(5000, weeks=60)
+    store = open_log_store("sqlite", path=str(tmp_path/"log.db")); store.replace(log.iloc[:3000])
+    aggs = TrainingAggregates(store)
+    aggs.add(log.iloc[3000:]); store.append(log.iloc[3000:])
+    pd.testing.assert_frame_equal(aggs.weekly(), TrainingAggregates(store).weekly(), check_dtype=False)
+
+def test_cycles_stay_apart_and_window_limits(tmp_path):
+    store = open_log_store("sqlite", path=str(tmp_path/"log.db"))
+    for when, kg in [("2023-01-18T10:00:00", 100), ("2024-01-17T10:00:00", 120)]:   # "Week 3" of two yearly cycles
+        store.append(log_rows("Week 3", "Day A", "Squat", "load", [{"set":1, "weight_kg":kg, "reps":5}], now=when))
+    aggs = TrainingAggregates(store)
+    assert aggs.exercise_trend("Squat")["tonnage"].tolist() == [500.0, 600.0]
+    assert aggs.exercise_trend("Squat", weeks=12)["tonnage"].tolist() == [600.0]
+    assert aggs.phase_volume()["sets"].sum() == 2
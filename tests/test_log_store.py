@@ -0,0 +1,28 @@
+"""Both log backends: segment roll-over, reads and merge dedup."""
+import pytest
+
+from coach.log_store import LogStore, SegmentLogStore, SqliteLogStore, coerce_log
+from coach.synthetic import synthetic_log
+
+@pytest.fixture(params=["sqlite","segments"])
+def store(request, tmp_path):
+    if request.param == "sqlite": return SqliteLogStore(str(tmp_path/"log.db"))
+    return SegmentLogStore(str(tmp_path/"segments"), segment_rows=1000)
+
+def test_append_read_and_merge(store):
+    log = synthetic_log(3000)
+    store.replace(log.iloc[:700]); store.append(log.iloc[700:2000])
+    assert store.read_all().equals(coerce_log(log.iloc[:2000]).reset_index(drop=True))
+    new = store.merge(log.iloc[1500:])
+    assert store.count() == 2000 + len(new) and len(new) <= 1000
+    assert store.tail(5)["datetime"].tolist() == new["datetime"].tail(5).tolist()
+
+def test_segments_never_exceed_segment_rows(tmp_path):
+    store = SegmentLogStore(str(tmp_path), segment_rows=1000)
+    store.replace(synthetic_log(700)); store.append(synthetic_log(2800))
+    assert [store._rows_in(p) for p in store._segments()] == [1000, 1000, 1000, 500]
+
+def test_backend_missing_a_method_fails_at_construction():
+    class Partial(LogStore):
+        def append(self, df): pass
+    with pytest.raises(TypeError): Partial()
@@ -0,0 +1,62 @@
+"""MediaCache with local files only: content-addressed storage, LRU eviction and offline reads."""
+import itertools, os
+import pytest
+
+from coach import media
+from coach.media import MediaCache
+
+def offline(url):
+    raise OSError(f"offline: {url}")
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Strictly increasing time.time(), so LRU order doesn't depend on clock resolution."""
+    tick = itertools.count(1)
+    monkeypatch.setattr(media.time, "time", lambda: float(next(tick)))
+
+def write(tmp_path, name, data):
+    p = tmp_path/name; p.write_bytes(data); return str(p)
+
+def objects(root):
+    return sorted(f for _, _, fs in os.walk(os.path.join(root, "objects")) for f in fs if not f.endswith(".thumb.jpg"))
+
+def test_ingest_dedups_by_content(tmp_path):
+    a, b = write(tmp_path, "a.gif", b"x"*100), write(tmp_path, "b.gif", b"x"*100)
+    cache = MediaCache(str(tmp_path/"cache"), max_bytes=10_000, fetch=offline)
+    ea, eb = cache.ingest(a), cache.ingest(b)
+    assert ea["sha"] == eb["sha"] and ea["path"] == eb["path"] and os.path.exists(ea["path"])
+    assert len(objects(cache.root)) == 1 and cache.total_bytes() == 100
+    assert cache.ingest(a)["path"] == ea["path"]   # already cached: no second copy
+
+def test_evicts_least_recently_used(tmp_path, clock):
+    cache = MediaCache(str(tmp_path/"cache"), max_bytes=300, fetch=offline)
+    a, b, c, d = (write(tmp_path, f"{n}.gif", n.encode()*100) for n in "abcd")
+    for p in (a, b, c): cache.ingest(p)
+    assert cache.get(a)                            # a is now more recent than b
+    cache.ingest(d)
+    assert cache.get(b) is None and all(cache.get(p) for p in (a, c, d))
+
+def test_shared_object_kept_until_last_source_evicted(tmp_path, clock):
+    cache = MediaCache(str(tmp_path/"cache"), max_bytes=200, fetch=offline)
+    a1, a2 = write(tmp_path, "a1.gif", b"a"*100), write(tmp_path, "a2.gif", b"a"*100)
+    b, c = write(tmp_path, "b.gif", b"b"*100), write(tmp_path, "c.gif", b"c"*100)
+    shared = cache.ingest(a1)["path"]; cache.ingest(a2); cache.ingest(b)
+    cache.get(a2); cache.ingest(c)                 # evicts a1 (frees nothing: a2 still uses the object), then b
+    assert cache.get(a1) is None and cache.get(b) is None and cache.get(a2)["path"] == shared and os.path.exists(shared)
+    cache.get(c); cache.ingest(write(tmp_path, "d.gif", b"d"*100))   # evicts a2, the object's last user
+    assert cache.get(a2) is None and not os.path.exists(shared)
+
+def test_offline_get_serves_cached_copy(tmp_path):
+    src = write(tmp_path, "clip.mp4", b"v"*500)
+    cache = MediaCache(str(tmp_path/"cache"), max_bytes=10_000, fetch=offline)
+    cache.ingest(src); os.remove(src)
+    reopened = MediaCache(str(tmp_path/"cache"), max_bytes=10_000, fetch=offline)   # index.json survives restarts
+    hit = reopened.get(src)
+    assert hit["kind"] == "video" and open(hit["path"], "rb").read() == b"v"*500
+    assert reopened.get("https://example.com/never-cached.gif") is None
+    with pytest.raises(OSError): reopened.ingest("https://example.com/never-cached.gif")
+
+def test_object_larger_than_cache_is_rejected(tmp_path):
+    cache = MediaCache(str(tmp_path/"cache"), max_bytes=50, fetch=offline)
+    ok, failed = cache.ingest_all([write(tmp_path, "big.gif", b"x"*100)])
+    assert ok == 0 and len(failed) == 1 and cache.index == {}
@@ -0,0 +1,58 @@
+"""batch_progression must give the same numbers and reason text as the scalar rules on each last set."""
+import random
+import pandas as pd
+import pytest
+
+from coach.catalog import exercise_key, read_catalog
+from coach.progression import batch_progression, interval_phase, suggest_next_load, suggest_next_interval
+from coach.protocol import rpe_hint
+
+CATALOG_CSV = ["exercise,rep_low,rep_high,increment_kg\nA,8,12,2.5\nB,6,8,5\nC,0,0,0\n",   # ints, floats, 0 → defaults
+               "exercise,rep_low,rep_high,increment_kg\nA,8,,2.5\nB,6,8.5,1.25\n"]     # NaN, fractional, missing C
+
+def synthetic_rows(seed, n=300):
+    rnd = random.Random(seed); rows = []
+    for _ in range(n):
+        ex = rnd.choice(["A","b ","C","D","E"])
+        rows.append(dict(athlete=rnd.choice(["x","y"]), datetime=f"2024-01-{rnd.randint(1,28):02d}T10:00:00", week="Week 1", day="Day A",
+                         exercise=ex, type="time" if ex in "DE" else "load", set=rnd.randint(1,4),
+                         weight_kg=rnd.choice([0,2.5,17.5,40.1,1.15]), reps=rnd.randint(0,15),
+                         rir_rpe=rnd.choice(["","RIR2","RPE 9","7","rir 3.5"]), work_sec=rnd.choice([0,15,30,45]),
+                         rest_sec=rnd.choice([0,5,30]), notes=""))
+    return pd.DataFrame(rows)
+
+def scalar_expectation(log, catalog, athlete, exercise):
+    key = exercise_key(exercise)
+    g = log[(log["athlete"]==athlete) & (exercise_key(log["exercise"])==key)].sort_values(["datetime","set"], kind="stable").iloc[-1]
+    if g["type"]=="time":
+        return suggest_next_interval(int(g["work_sec"] or 30), int(g["rest_sec"] or 30), rpe_hint(g["rir_rpe"]))
+    rec = catalog[catalog["exercise_key"]==key].astype(object)
+    lo, hi, inc = (rec.iloc[0]["rep_low"], rec.iloc[0]["rep_high"], rec.iloc[0]["increment_kg"]) if len(rec) else (8, 12, 2.5)
+    return suggest_next_load(g["weight_kg"], int(g["reps"]), lo, hi, inc)
+
+def mixed_catalog():
+    """Unparsed values as a hand-built frame would hold them: real ints next to floats, NaN and 0."""
+    c = pd.DataFrame({"exercise":["A","B","C"], "rep_low":[8, float("nan"), 6.0], "rep_high":[12, 10, 0], "increment_kg":[2.5, 0, 1]}, dtype=object)
+    return c.assign(exercise_key=exercise_key(c["exercise"].astype(str)))
+
+@pytest.mark.parametrize("catalog_src", CATALOG_CSV + [None])
+@pytest.mark.parametrize("seed", range(10))
+def test_batch_matches_scalar_rules(tmp_path, catalog_src, seed):
+    if catalog_src is None: catalog = mixed_catalog()
+    else:
+        path = tmp_path/"catalog.csv"; path.write_text(catalog_src); catalog = read_catalog(path)
+    log = synthetic_rows(seed)
+    table = batch_progression(log, catalog)
+    assert len(table) == log.assign(k=exercise_key(log["exercise"])).drop_duplicates(["athlete","k"]).shape[0]
+    for r in table.itertuples():
+        got = (r.next_weight_kg, r.reason) if r.type=="load" else (r.next_work_sec, r.next_rest_sec, r.reason)
+        assert got == tuple(scalar_expectation(log, catalog, r.athlete, r.exercise))
+
+def test_empty_log():
+    assert batch_progression(pd.DataFrame()).empty
+
+def test_interval_round_completes_when_work_ends():
+    assert interval_phase(0, 15, 30, 10) == (1, "WORK", 15, 0)
+    assert interval_phase(15, 15, 30, 10) == (1, "REST", 30, 1)          # round 1 is logged as its rest starts
+    assert interval_phase(9*45+14, 15, 30, 10) == (10, "WORK", 1, 9)
+    assert interval_phase(9*45+15, 15, 30, 10) == (10, "DONE", 0, 10)    # no rest after the last round
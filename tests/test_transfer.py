@@ -0,0 +1,16 @@
+"""Import validation: bad rows are counted as rejected, never silently coerced into another row's key."""
+import io
+
+from coach.log_store import open_log_store
+from coach.transfer import import_log
+
+CSV = ("datetime,week,day,exercise,type,set,weight_kg,reps,rir_rpe,work_sec,rest_sec,notes\n"
+       "2024-01-01T10:00:00,Week 1,Day A,Squat,load,1,40,8,,0,60,\n"
+       "2024-01-01T10:00:00,Week 1,Day A,Squat,load,1.9,40,8,,0,60,\n"     # fractional set
+       "2024-01-01T10:00:00,Week 1,Day A,Squat,load,2,40,8.6,,0,60,\n"     # fractional reps
+       "2024-01-01T10:00:00,Week 1,Day A,Squat,load,3.0,42.5,,,0,60,\n")   # whole float and empty reps are fine
+
+def test_fractional_ints_are_rejected(tmp_path):
+    store = open_log_store("sqlite", path=str(tmp_path/"log.db"))
+    assert import_log(store, io.BytesIO(CSV.encode()), "log.csv") == (2, 0, 2)
+    assert store.read_all()[["set","weight_kg","reps"]].values.tolist() == [[1, 40.0, 8], [3, 42.5, 0]]